@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from pathlib import Path
+from utils.ffmpeg import probe_audio
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional: without it the index relies on periodic rescans
+    FileSystemEventHandler = object
+    Observer = None
+
+SPLIT_EXTENSIONS = ('.mp3', '.ogg', '.wav')
+
+
+def _file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Forward filesystem events to the index as changed video IDs."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def on_any_event(self, event):
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path:
+                video_id = self.index.video_id_for_path(path)
+                if video_id:
+                    self.index.mark_dirty(video_id)
+
+
+class ArtifactIndex:
+    """In-memory index of the artifacts each video has on disk.
+
+    A full scan builds the index; afterwards a watchdog observer (when
+    installed) reports changed videos, which are re-read in debounced
+    batches. A periodic full rescan catches anything the watcher missed and
+    is the only update path without watchdog. Audio durations are probed
+    in the background so scans stay cheap.
+    """
+
+    def __init__(self, data_dir='data', rescan_interval=None):
+        self.data_dir = Path(data_dir)
+        self.final_result_dir = self.data_dir / 'final_result'
+        self.converted_dir = self.data_dir / 'converted'
+        if rescan_interval is None:
+            rescan_interval = 300 if Observer is not None else 30
+        self.rescan_interval = rescan_interval
+        self._videos = {}
+        self._dirty = set()
+        # (path, mtime, size) of files ffprobe failed on, skipped until they change
+        self._probe_failures = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    def video_id_for_path(self, path):
+        """Map a changed path to the video it belongs to, or None."""
+        path = Path(path)
+        for root in (self.final_result_dir, self.converted_dir):
+            try:
+                relative = path.resolve().relative_to(root.resolve())
+            except ValueError:
+                continue
+            if not relative.parts:
+                return None
+            if root == self.converted_dir:
+                name = relative.parts[0]
+                return name[:-len('.ogg')] if name.endswith('.ogg') and not name.startswith('.') else None
+            return relative.parts[0]
+        return None
+
+    def _scan_video(self, video_id):
+        """Read one video's artifacts from disk; returns None if it has none."""
+        video_dir = self.final_result_dir / video_id
+        try:
+            names = set(os.listdir(video_dir))
+        except (FileNotFoundError, NotADirectoryError):
+            names = set()
+
+        original_path = video_dir / 'original' / f"{video_id}.mp3"
+        transcription = None
+        for extension in ('parquet', 'csv'):
+            if f"{video_id}_transcription.{extension}" in names:
+                transcription = extension
+                break
+        split_names = []
+        if 'split' in names:
+            try:
+                split_names = [
+                    name for name in os.listdir(video_dir / 'split')
+                    if name.endswith(SPLIT_EXTENSIONS) and not name.startswith('.')
+                ]
+            except OSError:
+                pass
+
+        entry = {
+            'video_id': video_id,
+            'original_path': str(original_path),
+            'original_size': _file_size(original_path) if 'original' in names else None,
+            'converted_path': str(self.converted_dir / f"{video_id}.ogg"),
+            'converted_size': _file_size(self.converted_dir / f"{video_id}.ogg"),
+            'transcription': transcription,
+            'transcription_size': _file_size(video_dir / f"{video_id}_transcription.{transcription}") if transcription else None,
+            'split_count': len(split_names),
+            'wav_split_count': sum(1 for name in split_names if name.endswith('.wav')),
+            'duration': None,
+        }
+        if entry['original_size'] is None and entry['converted_size'] is None and not transcription:
+            return None
+        return entry
+
+    def _store(self, video_id, entry):
+        with self._lock:
+            previous = self._videos.get(video_id)
+            if entry is None:
+                self._videos.pop(video_id, None)
+                return
+            # Keep the probed duration while the original is unchanged
+            if previous and previous['original_size'] == entry['original_size']:
+                entry['duration'] = previous['duration']
+            self._videos[video_id] = entry
+
+    def refresh_video(self, video_id):
+        """Re-read one video's artifacts now, e.g. right after processing it."""
+        self._store(video_id, self._scan_video(video_id))
+
+    def rescan(self):
+        """Rebuild the whole index from disk."""
+        video_ids = set()
+        try:
+            video_ids.update(entry.name for entry in os.scandir(self.final_result_dir) if entry.is_dir())
+        except FileNotFoundError:
+            pass
+        try:
+            video_ids.update(
+                name[:-len('.ogg')] for name in os.listdir(self.converted_dir)
+                if name.endswith('.ogg') and not name.startswith('.')
+            )
+        except FileNotFoundError:
+            pass
+
+        entries = {video_id: self._scan_video(video_id) for video_id in video_ids}
+        with self._lock:
+            stale = set(self._videos) - video_ids
+        for video_id in stale:
+            self._store(video_id, None)
+        for video_id, entry in entries.items():
+            self._store(video_id, entry)
+
+    def mark_dirty(self, video_id):
+        with self._lock:
+            self._dirty.add(video_id)
+        self._wakeup.set()
+
+    def _probe_durations(self):
+        """Fill in missing durations of downloaded originals."""
+        with self._lock:
+            pending = [
+                (video_id, entry['original_path']) for video_id, entry in self._videos.items()
+                if entry['duration'] is None and entry['original_size']
+            ]
+        for video_id, path in pending:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            key = (path, stat.st_mtime_ns, stat.st_size)
+            if key in self._probe_failures:
+                continue
+            try:
+                duration = probe_audio(path)['duration']
+            except Exception as e:
+                print(f"[WARNING] Could not probe {path}: {e}")
+                self._probe_failures.add(key)
+                continue
+            with self._lock:
+                if video_id in self._videos:
+                    self._videos[video_id]['duration'] = duration
+
+    def _worker(self):
+        last_rescan = time.monotonic()
+        while True:
+            woken = self._wakeup.wait(timeout=self.rescan_interval)
+            if woken:
+                # Let a burst of events (e.g. writing hundreds of splits) settle
+                time.sleep(0.5)
+                self._wakeup.clear()
+                with self._lock:
+                    dirty, self._dirty = self._dirty, set()
+                for video_id in dirty:
+                    self.refresh_video(video_id)
+            if time.monotonic() - last_rescan >= self.rescan_interval:
+                try:
+                    self.rescan()
+                except Exception as e:
+                    print(f"[ERROR] Artifact rescan failed: {e}")
+                last_rescan = time.monotonic()
+            self._probe_durations()
+
+    def start(self):
+        """Scan once, then keep the index in sync in the background."""
+        if self._thread is not None:
+            return
+        self.final_result_dir.mkdir(parents=True, exist_ok=True)
+        self.converted_dir.mkdir(parents=True, exist_ok=True)
+        self.rescan()
+
+        if Observer is not None:
+            try:
+                self._observer = Observer()
+                handler = _ChangeHandler(self)
+                self._observer.schedule(handler, str(self.final_result_dir), recursive=True)
+                self._observer.schedule(handler, str(self.converted_dir), recursive=False)
+                self._observer.daemon = True
+                self._observer.start()
+            except Exception as e:
+                print(f"[WARNING] File watcher unavailable, using periodic rescans: {e}")
+                self._observer = None
+
+        self._thread = threading.Thread(target=self._worker, name='artifact-index', daemon=True)
+        self._thread.start()
+        # Probe durations right away instead of waiting for the first timeout
+        self._wakeup.set()
+
+    def get(self, video_id):
+        """Get a copy of a video's artifact entry, or None."""
+        with self._lock:
+            entry = self._videos.get(video_id)
+            return dict(entry) if entry else None
+
+    def get_entries(self, video_ids=None):
+        """Get copies of the entries for the given IDs (all videos by default)."""
+        with self._lock:
+            if video_ids is None:
+                return [dict(entry) for entry in self._videos.values()]
+            return [dict(self._videos[video_id]) for video_id in video_ids if video_id in self._videos]
+
+    def get_statuses(self, video_ids):
+        """Get the processing status of many videos in one pass, e.g. a page of cards.
+
+        Returns:
+            dict: video_id -> {'downloaded', 'converted', 'transcribed', 'split', 'wav_split'}
+        """
+        statuses = {}
+        with self._lock:
+            for video_id in video_ids:
+                entry = self._videos.get(video_id) or {}
+                statuses[video_id] = {
+                    'downloaded': entry.get('original_size') is not None,
+                    'converted': entry.get('converted_size') is not None,
+                    'transcribed': bool(entry.get('transcription')),
+                    'split': bool(entry.get('split_count')),
+                    'wav_split': bool(entry.get('wav_split_count')),
+                }
+        return statuses
+
+    def get_stage_ids(self):
+        """Get the set of video IDs in each stage, like reconciliation.scan_storage."""
+        stages = {'downloaded': set(), 'converted': set(), 'transcribed': set(), 'split': set()}
+        with self._lock:
+            for video_id, entry in self._videos.items():
+                if entry['original_size'] is not None:
+                    stages['downloaded'].add(video_id)
+                if entry['converted_size'] is not None:
+                    stages['converted'].add(video_id)
+                if entry['transcription']:
+                    stages['transcribed'].add(video_id)
+                if entry['split_count']:
+                    stages['split'].add(video_id)
+        return stages
+
+
+# One index per data directory, shared by every session in the process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_artifact_index(data_dir='data'):
+    """Get the process-wide, running artifact index for a data directory."""
+    key = str(Path(data_dir).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            index = ArtifactIndex(data_dir)
+            index.start()
+            _indexes[key] = index
+        return _indexes[key]
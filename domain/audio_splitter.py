@@ -1,13 +1,54 @@
 from pathlib import Path
+from collections import OrderedDict
+import threading
 import pandas as pd
 from pydub import AudioSegment
 import os
+from utils.ffmpeg import render_segment
+from utils.atomic_io import atomic_path
+from domain.transcription_store import TranscriptionStore
+
+
+class SegmentCache:
+    """Bounded LRU cache of rendered segment audio, shared across reruns."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+
+# Process-wide so rendered segments survive Streamlit script reruns
+segment_cache = SegmentCache()
+
 
 class AudioSplitter:
     def __init__(self):
         """Initialize the audio splitter service."""
         self.final_result_dir = Path('data/final_result')
         self.final_result_dir.mkdir(parents=True, exist_ok=True)
+        self.converted_dir = Path('data/converted')
+        self.store = TranscriptionStore(self.final_result_dir)
     
     def get_splits_directory(self, video_id):
         """Get the directory for storing splits of a specific video."""
@@ -32,40 +73,102 @@ class AudioSplitter:
         splits_dir = self.get_splits_directory(video_id)
         return any(splits_dir.glob('*.*')) if splits_dir.exists() else False
     
-    def get_splits(self, transcription_path):
+    def get_splits(self, video_id):
         """Get information about splits for a video."""
         try:
-            transcription_df = pd.read_csv(transcription_path)
-            splits = transcription_df.to_dict('records')
+            transcription_df = self.store.read(video_id)
+            if transcription_df is None:
+                return []
             
-            # Filter out splits where audio file doesn't exist
-            valid_splits = []
-            for split in splits:
-                if 'audio_file' in split and os.path.exists(os.path.join(os.path.dirname(transcription_path), split['audio_file'])):
-                    valid_splits.append(split)
+            # Filter out splits where audio file doesn't exist, with one directory listing
+            splits_dir = self.final_result_dir / video_id / 'split'
+            existing = {f"split/{name}" for name in os.listdir(splits_dir)} if splits_dir.exists() else set()
+            valid_df = transcription_df[transcription_df['audio_file'].isin(existing)]
             
-            return valid_splits
+            return valid_df.to_dict('records')
             
         except Exception as e:
             print(f"Error getting splits: {e}")
             return []
     
+    def get_virtual_splits(self, video_id):
+        """Get every transcription segment, whether or not it was split to disk."""
+        try:
+            transcription_df = self.store.read(video_id)
+            return [] if transcription_df is None else transcription_df.to_dict('records')
+        except Exception as e:
+            print(f"Error getting virtual splits: {e}")
+            return []
+    
     def get_splitted_audio_path(self, video_id, audio_file):
         """Get the path to a specific split audio file."""
         return str(self.final_result_dir / video_id / audio_file)
     
-    def split_audio(self, source_path, video_id, transcription_path, output_format='wav'):
+    def get_segment_source(self, video_id):
+        """Get the audio file that virtual segments are rendered from."""
+        ogg_path = self.converted_dir / f"{video_id}.ogg"
+        if ogg_path.exists():
+            return ogg_path
+        mp3_path = self.final_result_dir / video_id / 'original' / f"{video_id}.mp3"
+        if mp3_path.exists():
+            return mp3_path
+        return None
+    
+    def get_segment_audio(self, video_id, split):
+        """Get playable audio for a segment.
+        
+        Returns the path of the materialized split when it exists, otherwise
+        renders the segment on demand from the source audio and returns WAV bytes.
+        """
+        audio_file = split.get('audio_file')
+        if isinstance(audio_file, str) and audio_file:
+            split_path = self.final_result_dir / video_id / audio_file
+            if split_path.exists():
+                return str(split_path)
+        
+        source_path = self.get_segment_source(video_id)
+        if source_path is None:
+            return None
+        
+        start = float(split['start_time_seconds'])
+        end = float(split['end_time_seconds'])
+        key = (str(source_path), os.path.getmtime(source_path), round(start, 3), round(end, 3))
+        data = segment_cache.get(key)
+        if data is None:
+            print(f"[DEBUG] Rendering virtual segment {start:.2f}s-{end:.2f}s from {source_path}")
+            data = render_segment(
+                source_path,
+                start,
+                end - start,
+                output_format='wav',
+                parameters=["-acodec", "pcm_s16le"]
+            )
+            segment_cache.put(key, data)
+        return data
+    
+    def split_audio(self, source_path, video_id, output_format='wav', progress_callback=None):
+        """Split audio file based on transcription segments.
+        
+        Holds the transcription lock, so a concurrent transcription or split
+        of the same video can't interleave with the read-modify-write.
+        """
+        with self.store.lock(video_id):
+            return self._split_audio(source_path, video_id, output_format, progress_callback)
+    
+    def _split_audio(self, source_path, video_id, output_format='wav', progress_callback=None):
         """Split audio file based on transcription segments.
         
         Args:
             source_path: Path to the source audio file
             video_id: Video ID for organizing splits
-            transcription_path: Path to the transcription CSV file
             output_format: Format to save split files in ('wav' recommended for high quality)
+            progress_callback: Called with the fraction of segments exported (0 to 1)
         """
         try:
             # Read transcription data
-            transcription_df = pd.read_csv(transcription_path)
+            transcription_df = self.store.read(video_id)
+            if transcription_df is None:
+                return False, "Transcription not found"
             
             # Load audio file
             print(f"[DEBUG] Loading audio file from {source_path}")
@@ -85,7 +188,9 @@ class AudioSplitter:
             
             # Process each segment
             split_info = []
-            for idx, segment in transcription_df.iterrows():
+            for position, (idx, segment) in enumerate(transcription_df.iterrows()):
+                if progress_callback:
+                    progress_callback(position / len(transcription_df))
                 try:
                     # Convert times to milliseconds
                     start_ms = int(segment['start_time_seconds'] * 1000)
@@ -102,26 +207,27 @@ class AudioSplitter:
                     
                     print(f"[DEBUG] Exporting segment to {output_path}")
                     
-                    # Export segment with appropriate settings
-                    if output_format == 'wav':
-                        # Export as 24-bit WAV with 48kHz sample rate
-                        segment_audio.export(
-                            str(output_path),
-                            format="wav",
-                            parameters=[
-                                "-acodec", "pcm_s24le",  # 24-bit depth
-                                "-ar", "48000"  # 48kHz sample rate
-                            ]
-                        )
-                    elif output_format == 'mp3':
-                        segment_audio.export(
-                            str(output_path),
-                            format="mp3",
-                            bitrate="192k",
-                            parameters=["-q:a", "0"]
-                        )
-                    else:
-                        segment_audio.export(str(output_path), format=output_format)
+                    # Export segment with appropriate settings, replacing any old file atomically
+                    with atomic_path(output_path) as tmp_path:
+                        if output_format == 'wav':
+                            # Export as 24-bit WAV with 48kHz sample rate
+                            segment_audio.export(
+                                str(tmp_path),
+                                format="wav",
+                                parameters=[
+                                    "-acodec", "pcm_s24le",  # 24-bit depth
+                                    "-ar", "48000"  # 48kHz sample rate
+                                ]
+                            )
+                        elif output_format == 'mp3':
+                            segment_audio.export(
+                                str(tmp_path),
+                                format="mp3",
+                                bitrate="192k",
+                                parameters=["-q:a", "0"]
+                            )
+                        else:
+                            segment_audio.export(str(tmp_path), format=output_format)
                     
                     # Store relative path from transcription file location
                     relative_path = f"split/{filename}"
@@ -145,14 +251,12 @@ class AudioSplitter:
             if not split_info:
                 return False, "Failed to create any valid splits"
             
-            # Update CSV file with split information
-            splits_df = pd.DataFrame(split_info)
-            
             # Update transcription data with split information
+            splits_df = pd.DataFrame(split_info)
             transcription_df['audio_file'] = splits_df['audio_file']
             
             # Write updated transcription data
-            transcription_df.to_csv(transcription_path, index=False)
+            self.store.write(video_id, transcription_df)
             
             return True, f"Split {len(split_info)} segments successfully"
             
@@ -0,0 +1,333 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import pandas as pd
+from utils.atomic_io import atomic_path
+
+CATALOG_COLUMNS = [
+    'id',
+    'title',
+    'description',
+    'thumbnail',
+    'channel_title',
+    'published_at',
+    'duration',
+    'duration_seconds',
+    'license',
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    thumbnail TEXT,
+    channel_title TEXT,
+    published_at TEXT,
+    duration TEXT,
+    duration_seconds INTEGER,
+    license TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel_title);
+CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published_at);
+CREATE INDEX IF NOT EXISTS idx_videos_duration ON videos(duration_seconds);
+
+CREATE INDEX IF NOT EXISTS idx_videos_title ON videos(title);
+CREATE INDEX IF NOT EXISTS idx_videos_channel_published ON videos(channel_title, published_at);
+CREATE INDEX IF NOT EXISTS idx_videos_channel_duration ON videos(channel_title, duration_seconds);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# In-memory dtypes of a loaded catalog; strings are Arrow-backed, repeated
+# values categorical and dates real timestamps, so sorts and filters vectorize
+CATALOG_DTYPES = {
+    'id': 'string[pyarrow]',
+    'title': 'string[pyarrow]',
+    'description': 'string[pyarrow]',
+    'thumbnail': 'string[pyarrow]',
+    'channel_title': 'category',
+    'published_at': 'datetime64[ns, UTC]',
+    'duration': 'string[pyarrow]',
+    'duration_seconds': 'int32',
+    'license': 'category',
+}
+
+# How published_at is stored, matching the YouTube API format
+PUBLISHED_AT_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Columns the pages may sort by; anything else is rejected before reaching SQL
+SORT_KEYS = ('published_at', 'duration_seconds', 'title', 'channel_title')
+
+# Loaded catalogs keyed by database path, reused while the files are unchanged
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+def duration_to_seconds(duration):
+    """Convert a MM:SS or HH:MM:SS duration string to seconds."""
+    try:
+        parts = str(duration).split(':')
+        if len(parts) == 2:  # MM:SS format
+            return int(parts[0]) * 60 + int(parts[1])
+        elif len(parts) == 3:  # HH:MM:SS format
+            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+        return 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def apply_schema(df):
+    """Coerce a catalog DataFrame to CATALOG_DTYPES, adding missing columns."""
+    df = df.copy()
+    for column in CATALOG_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    if df['duration_seconds'].isna().any():
+        missing = df['duration_seconds'].isna()
+        df.loc[missing, 'duration_seconds'] = df.loc[missing, 'duration'].map(duration_to_seconds)
+    df['duration_seconds'] = pd.to_numeric(df['duration_seconds'], errors='coerce').fillna(0).astype('int32')
+    df['published_at'] = pd.to_datetime(df['published_at'], utc=True, errors='coerce')
+    for column, dtype in CATALOG_DTYPES.items():
+        if column not in ('duration_seconds', 'published_at'):
+            df[column] = df[column].astype(dtype)
+    return df[CATALOG_COLUMNS]
+
+
+def to_excel_frame(df):
+    """Make a catalog DataFrame writable to Excel, which has no timezone support."""
+    df = df.copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.DatetimeTZDtype):
+            df[column] = df[column].dt.tz_localize(None)
+    return df
+
+
+def _published_at_to_text(value):
+    """Normalize any date representation to the stored published_at format."""
+    timestamp = pd.to_datetime(value, utc=True, errors='coerce')
+    return None if pd.isna(timestamp) else timestamp.strftime(PUBLISHED_AT_FORMAT)
+
+
+class VideoCatalog:
+    """Embedded SQLite catalog of searched videos.
+
+    Runs in WAL mode so readers never block the writer and concurrent
+    sessions see each other's writes, with indexes on the columns the
+    pages filter and sort by. Whole-catalog reads go through a process-wide
+    DataFrame cache keyed on the database and WAL file mtime and size, and
+    every write through this class invalidates it.
+    """
+
+    _init_lock = threading.Lock()
+
+    def __init__(self, db_path='data/catalog.db'):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._init_lock:
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a transaction on a fresh connection, so threads never share one."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _signature(self):
+        """Get (mtime, size) of the database and its WAL, which change on every commit."""
+        signature = []
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + '-wal')):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _invalidate(self):
+        with _frames_lock:
+            _frames.pop(str(self.db_path), None)
+
+    def _load(self):
+        """Get the cached (DataFrame, id -> row position) pair, reloading if stale."""
+        key = str(self.db_path)
+        signature = self._signature()
+        with _frames_lock:
+            cached = _frames.get(key)
+            if cached and cached[0] == signature:
+                return cached[1], cached[2]
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(CATALOG_COLUMNS)} FROM videos ORDER BY rowid", conn
+            )
+        df = apply_schema(df)
+        index = {video_id: position for position, video_id in enumerate(df['id'])}
+        with _frames_lock:
+            _frames[key] = (signature, df, index)
+        return df, index
+
+    @staticmethod
+    def _to_row(video):
+        """Convert a video dict to a tuple in CATALOG_COLUMNS order."""
+        row = []
+        for column in CATALOG_COLUMNS:
+            value = video.get(column)
+            if column == 'duration_seconds' and (value is None or pd.isna(value)):
+                value = duration_to_seconds(video.get('duration'))
+            elif value is not None and pd.isna(value):
+                value = None
+            elif column == 'duration_seconds':
+                value = int(value)
+            elif column == 'published_at':
+                value = _published_at_to_text(value)
+            elif value is not None:
+                value = str(value)
+            row.append(value)
+        return tuple(row)
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
+
+    def get(self, video_id):
+        """Get a single video by ID, or None, in the same form as query() rows."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(CATALOG_COLUMNS)} FROM videos WHERE id = ?", (video_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {k: v for k, v in dict(row).items() if v is not None}
+
+    def delete(self, video_id):
+        """Delete a video by ID; returns True if it existed."""
+        with self._connect() as conn:
+            cursor = conn.execute('DELETE FROM videos WHERE id = ?', (video_id,))
+        self._invalidate()
+        return cursor.rowcount > 0
+
+    def upsert(self, videos):
+        """Insert videos, replacing existing rows with the same ID."""
+        rows = [self._to_row(video) for video in videos]
+        placeholders = ', '.join('?' for _ in CATALOG_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO videos ({', '.join(CATALOG_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+        self._invalidate()
+        return len(rows)
+
+    def replace_all(self, df):
+        """Replace the whole catalog with the rows of a DataFrame, in order."""
+        rows = [self._to_row(video) for video in df.to_dict('records')]
+        placeholders = ', '.join('?' for _ in CATALOG_COLUMNS)
+        with self._connect() as conn:
+            conn.execute('DELETE FROM videos')
+            conn.executemany(
+                f"INSERT OR REPLACE INTO videos ({', '.join(CATALOG_COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+        self._invalidate()
+        return len(rows)
+
+    @staticmethod
+    def _where(channel=None, video_ids=None):
+        """Build the WHERE clause and parameters shared by query and get_stats."""
+        clauses, params = [], []
+        if channel:
+            clauses.append('channel_title = ?')
+            params.append(channel)
+        if video_ids is not None:
+            # One JSON parameter instead of thousands of placeholders
+            clauses.append('id IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps(sorted(video_ids)))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, channel=None, sort_key=None, order='desc', offset=0, limit=15, video_ids=None):
+        """Get one page of videos and the total number of matches.
+
+        Args:
+            channel: Only include videos of this channel
+            sort_key: One of SORT_KEYS, or None for insertion order
+            order: 'asc' or 'desc'
+            offset: Number of matching rows to skip
+            limit: Maximum number of rows to return
+            video_ids: Only include these video IDs
+        """
+        if sort_key is not None and sort_key not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_key}")
+        direction = 'ASC' if order == 'asc' else 'DESC'
+        order_by = f"{sort_key} {direction}, rowid" if sort_key else f"rowid {direction}"
+        where, params = self._where(channel, video_ids)
+
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM videos{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(CATALOG_COLUMNS)} FROM videos{where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def get_stats(self, channel=None, video_ids=None):
+        """Get video count, total duration and channel count in one query."""
+        where, params = self._where(channel, video_ids)
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(duration_seconds), 0), COUNT(DISTINCT channel_title) FROM videos{where}",
+                params
+            ).fetchone()
+        return {'videos': row[0], 'duration_seconds': row[1], 'channels': row[2]}
+
+    def channel_names(self):
+        """Get sorted unique channel names."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT DISTINCT channel_title FROM videos WHERE channel_title IS NOT NULL ORDER BY channel_title'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def to_dataframe(self):
+        """Get the whole catalog as a DataFrame (a copy of the cached one)."""
+        return self._load()[0].copy()
+
+    def get_meta(self, key):
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def import_excel(self, excel_path):
+        """Import an existing youtube_videos.xlsx once; returns rows imported."""
+        excel_path = Path(excel_path)
+        if self.get_meta('imported_excel') or not excel_path.exists():
+            return 0
+        print(f"[DEBUG] Importing {excel_path} into catalog")
+        df = pd.read_excel(excel_path)
+        imported = self.upsert(df.to_dict('records')) if not df.empty else 0
+        self.set_meta('imported_excel', str(excel_path))
+        return imported
+
+    def export_excel(self, excel_path):
+        """Write the catalog to an Excel file; returns the number of rows."""
+        df = self.to_dataframe()
+        with atomic_path(excel_path) as tmp_path:
+            to_excel_frame(df).to_excel(tmp_path, index=False)
+        return len(df)
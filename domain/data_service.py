@@ -4,20 +4,34 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 from datetime import datetime
+from domain.catalog import VideoCatalog, CATALOG_COLUMNS, apply_schema, to_excel_frame
+from domain.reconciliation import scan_storage, STAGES
+from domain.search_index import get_search_index
+from utils.atomic_io import atomic_path, file_lock, write_json
 
 class DataService:
     def __init__(self, data_dir='data'):
-        """Initialize the data service."""
+        """Initialize the data service.
+        
+        Video metadata lives in an SQLite catalog (catalog.db); Excel files
+        are only written on demand as exports.
+        """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.downloads_file = self.data_dir / 'downloads.json'
         self.videos_excel = self.data_dir / 'youtube_videos.xlsx'
         self.downloaded_videos_excel = self.data_dir / 'downloaded_videos.xlsx'
-        self.downloaded_dir = self.data_dir / 'downloaded'
+        self.catalog = VideoCatalog(self.data_dir / 'catalog.db')
         
         # Create downloads file if it doesn't exist
         if not self.downloads_file.exists():
             self._save_downloads([])
+        
+        # The catalog replaced youtube_videos.xlsx; bring existing data over once
+        try:
+            self.catalog.import_excel(self.videos_excel)
+        except Exception as e:
+            print(f"[ERROR] Could not import {self.videos_excel}: {str(e)}")
     
     def _load_downloads(self):
         """Load downloads data from JSON file."""
@@ -29,171 +43,158 @@ class DataService:
     
     def _save_downloads(self, downloads):
         """Save downloads data to JSON file."""
-        with open(self.downloads_file, 'w') as f:
-            json.dump(downloads, f, indent=2)
+        write_json(self.downloads_file, downloads)
     
-    def _get_video_info_from_excel(self, video_id):
-        """Get video information from Excel file."""
+    def get_video_info(self, video_id):
+        """Get video information from the catalog."""
         try:
-            if os.path.exists(self.videos_excel):
-                df = pd.read_excel(self.videos_excel)
-                video_info = df[df['id'] == video_id]
-                if not video_info.empty:
-                    # Convert the row to a dictionary
-                    info_dict = video_info.iloc[0].to_dict()
-                    # Clean up NaN values
-                    return {k: v for k, v in info_dict.items() if pd.notna(v)}
+            return self.catalog.get(video_id)
         except Exception as e:
-            print(f"Error reading Excel: {str(e)}")
+            print(f"Error reading catalog: {str(e)}")
         return None
     
-    def get_video_info(self, video_id):
-        """Get video information from Excel file."""
-        return self._get_video_info_from_excel(video_id)
+    def _remove_from_search(self, video_ids):
+        """Drop deleted videos from transcription search."""
+        try:
+            get_search_index(self.data_dir / 'search_index.db').remove_videos(video_ids)
+        except Exception as e:
+            print(f"[WARNING] Could not remove videos from the search index: {str(e)}")
     
     def delete_video(self, video_id):
-        """Delete a video from the Excel database."""
+        """Delete a video from the catalog and from transcription search."""
         try:
-            if os.path.exists(self.videos_excel):
-                df = pd.read_excel(self.videos_excel)
-                # Remove the video with the given ID
-                df = df[df['id'] != video_id]
-                # Save the updated DataFrame back to Excel
-                df.to_excel(self.videos_excel, index=False)
-                return True
-            return False
+            deleted = self.catalog.delete(video_id)
         except Exception as e:
             print(f"Error deleting video: {str(e)}")
             return False
+        if deleted:
+            self._remove_from_search([video_id])
+        return deleted
     
-    def get_downloaded_videos(self):
-        """Get list of all downloaded videos from Excel."""
+    def get_videos_dataframe(self):
+        """Get all catalog videos as a DataFrame."""
         try:
-            if os.path.exists(self.videos_excel):
-                df = pd.read_excel(self.videos_excel)
-                # Convert DataFrame to list of dictionaries, removing NaN values
-                videos = []
-                for _, row in df.iterrows():
-                    video_dict = {k: v for k, v in row.to_dict().items() if pd.notna(v)}
-                    videos.append(video_dict)
-                return videos
+            return self.catalog.to_dataframe()
         except Exception as e:
-            print(f"Error reading Excel: {str(e)}")
-        return []
+            print(f"Error reading catalog: {str(e)}")
+            return apply_schema(pd.DataFrame(columns=CATALOG_COLUMNS))
     
-    def get_channel_names(self):
-        """Get list of unique channel names from Excel."""
+    def replace_videos(self, df):
+        """Replace the catalog contents, e.g. after sorting or de-duplicating."""
         try:
-            if os.path.exists(self.videos_excel):
-                df = pd.read_excel(self.videos_excel)
-                return ["All Channels"] + sorted(df['channel_title'].unique().tolist())
+            return self.catalog.replace_all(df)
         except Exception as e:
-            print(f"Error reading Excel: {str(e)}")
-        return ["All Channels"]
+            st.error(f"Error saving to catalog: {str(e)}")
+            return 0
     
-    def save_videos_to_excel(self, videos, excel_file=None):
-        """Save videos data to Excel file"""
-        if excel_file:
-            self.videos_excel = excel_file
-            
-        # Convert videos to DataFrame
-        df = pd.DataFrame(videos)
+    def query_videos(self, channel=None, sort_key=None, order='desc', page=1, page_size=15, video_ids=None):
+        """Get one page of catalog videos, filtered and sorted in SQL.
         
-        # Add duration_seconds column
-        def duration_to_seconds(duration):
-            try:
-                parts = duration.split(':')
-                if len(parts) == 2:  # MM:SS format
-                    return int(parts[0]) * 60 + int(parts[1])
-                elif len(parts) == 3:  # HH:MM:SS format
-                    return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-                return 0
-            except:
-                return 0
-                
-        df['duration_seconds'] = df['duration'].apply(duration_to_seconds)
+        Args:
+            channel: Channel name to filter by ("All Channels" or None for all)
+            sort_key: Column to sort by, see catalog.SORT_KEYS (None keeps insertion order)
+            order: 'asc' or 'desc'
+            page: 1-based page number
+            page_size: Videos per page
+            video_ids: Optional collection of IDs to restrict the query to
         
+        Returns:
+            tuple: (list of video dicts for the page, total number of matching videos)
+        """
+        if channel == "All Channels":
+            channel = None
         try:
-            # If file exists, append new data
-            if os.path.exists(self.videos_excel):
-                existing_df = pd.read_excel(self.videos_excel)
-                # Remove duplicates based on video ID
-                df = pd.concat([existing_df, df]).drop_duplicates(subset=['id'], keep='last')
-            
-            # Save to Excel
-            df.to_excel(self.videos_excel, index=False)
-            return len(df)
+            return self.catalog.query(
+                channel=channel,
+                sort_key=sort_key,
+                order=order,
+                offset=max(page - 1, 0) * page_size,
+                limit=page_size,
+                video_ids=video_ids
+            )
+        except Exception as e:
+            print(f"Error querying catalog: {str(e)}")
+            return [], 0
+    
+    def get_video_stats(self, channel=None, video_ids=None):
+        """Get count, total duration and channel count of catalog videos."""
+        if channel == "All Channels":
+            channel = None
+        try:
+            return self.catalog.get_stats(channel=channel, video_ids=video_ids)
+        except Exception as e:
+            print(f"Error reading catalog stats: {str(e)}")
+            return {'videos': 0, 'duration_seconds': 0, 'channels': 0}
+    
+    def get_channel_names(self):
+        """Get list of unique channel names from the catalog."""
+        try:
+            return ["All Channels"] + self.catalog.channel_names()
         except Exception as e:
-            st.error(f"Error saving to Excel: {str(e)}")
+            print(f"Error reading catalog: {str(e)}")
+        return ["All Channels"]
+    
+    def save_videos(self, videos):
+        """Save videos to the catalog; returns the total number of videos stored."""
+        try:
+            self.catalog.upsert(videos)
+            return self.catalog.count()
+        except Exception as e:
+            st.error(f"Error saving to catalog: {str(e)}")
             return 0
     
-    def clean_excel_data(self):
-        """Remove entries from Excel that don't have corresponding audio files"""
+    def export_videos_to_excel(self, excel_file=None):
+        """Export the catalog to youtube_videos.xlsx on demand."""
+        excel_file = excel_file or self.videos_excel
         try:
-            if not os.path.exists(self.videos_excel):
-                return 0, 0
-            
-            # Read Excel file
-            df = pd.read_excel(self.videos_excel)
+            self.catalog.export_excel(excel_file)
+            return excel_file
+        except Exception as e:
+            st.error(f"Error exporting to Excel: {str(e)}")
+            return None
+    
+    def clean_catalog(self):
+        """Remove catalog entries that don't have corresponding audio files"""
+        try:
+            df = self.get_videos_dataframe()
             initial_count = len(df)
+            initial_ids = set(df['id'])
             
-            # Get list of downloaded files
-            if not (self.data_dir / 'downloaded').exists():
-                return initial_count, 0
-            
-            downloaded_files = list((self.data_dir / 'downloaded').glob('*.mp3'))
-            downloaded_ids = [f.stem for f in downloaded_files]
-            
-            # Filter DataFrame to keep only downloaded files
+            # Filter DataFrame to keep only downloaded videos
+            downloaded_ids = scan_storage(self.data_dir)['downloaded']
             df = df[df['id'].isin(downloaded_ids)]
             
-            # Save cleaned DataFrame
-            df.to_excel(self.videos_excel, index=False)
+            # Save cleaned catalog
+            if len(df) != initial_count:
+                self.catalog.replace_all(df)
+                self._remove_from_search(initial_ids - set(df['id']))
             final_count = len(df)
             
             return initial_count, final_count
         except Exception as e:
-            st.error(f"Error cleaning Excel data: {str(e)}")
+            st.error(f"Error cleaning catalog: {str(e)}")
             return 0, 0
 
-    def _is_video_downloaded(self, video_id):
-        """Check if a video has been downloaded by looking for its audio file"""
-        # Check in downloaded directory for any file starting with video_id
-        if self.downloaded_dir.exists():
-            for file in self.downloaded_dir.glob(f'{video_id}.*'):
-                return True
-        return False
+    def reconcile(self):
+        """Reconcile the catalog with the files on disk in a single scan.
+        
+        Writes downloaded_videos.xlsx with one flag column per pipeline stage
+        and returns the number of catalog videos found in each stage.
+        """
+        stages = scan_storage(self.data_dir)
+        df = self.get_videos_dataframe()
+        for stage in STAGES:
+            df[stage] = df['id'].isin(stages[stage])
+        
+        downloaded_df = df[df['downloaded']]
+        with file_lock(self.downloaded_videos_excel), atomic_path(self.downloaded_videos_excel) as tmp_path:
+            to_excel_frame(downloaded_df).to_excel(tmp_path, index=False)
+        return {stage: int(df[stage].sum()) for stage in STAGES}
             
     def update_downloaded_videos_excel(self):
         """Update downloaded_videos.xlsx with only downloaded audio files"""
         try:
-            # Get all videos from main Excel
-            if not os.path.exists(self.videos_excel):
-                st.error("Main videos database (youtube_videos.xlsx) not found!")
-                return 0
-                
-            df = pd.read_excel(self.videos_excel)
-            if df.empty:
-                return 0
-                
-            # Filter videos that have downloaded files
-            downloaded_videos = []
-            for _, row in df.iterrows():
-                video_id = row['id']
-                if self._is_video_downloaded(video_id):
-                    downloaded_videos.append(row.to_dict())
-            
-            # Create new DataFrame and save
-            if downloaded_videos:
-                downloaded_df = pd.DataFrame(downloaded_videos)
-                downloaded_df.to_excel(self.downloaded_videos_excel, index=False)
-                return len(downloaded_videos)
-            else:
-                # Create empty Excel with columns
-                empty_df = pd.DataFrame(columns=df.columns)
-                empty_df.to_excel(self.downloaded_videos_excel, index=False)
-                return 0
-                
+            return self.reconcile()['downloaded']
         except Exception as e:
             st.error(f"Error updating downloaded videos Excel: {str(e)}")
             return 0
@@ -204,30 +205,21 @@ class DataService:
             if not os.path.exists(self.downloaded_videos_excel):
                 st.error("Downloaded videos database not found! Please update it first.")
                 return 0
-                
-            df = pd.read_excel(self.downloaded_videos_excel)
-            if df.empty:
-                return 0
-                
-            initial_count = len(df)
-            
-            # Filter videos that have downloaded files
-            downloaded_videos = []
-            for _, row in df.iterrows():
-                video_id = row['id']
-                if self._is_video_downloaded(video_id):
-                    downloaded_videos.append(row.to_dict())
             
-            # Save filtered DataFrame
-            if downloaded_videos:
-                downloaded_df = pd.DataFrame(downloaded_videos)
-                downloaded_df.to_excel(self.downloaded_videos_excel, index=False)
-                return initial_count - len(downloaded_videos)  # Return number of removed entries
-            else:
-                # Create empty Excel with columns
-                empty_df = pd.DataFrame(columns=df.columns)
-                empty_df.to_excel(self.downloaded_videos_excel, index=False)
-                return initial_count
+            downloaded_ids = scan_storage(self.data_dir)['downloaded']
+            with file_lock(self.downloaded_videos_excel):
+                df = pd.read_excel(self.downloaded_videos_excel)
+                if df.empty:
+                    return 0
+                    
+                initial_count = len(df)
+                
+                # Filter videos that have downloaded files
+                df = df[df['id'].isin(downloaded_ids)]
+                if len(df) != initial_count:
+                    with atomic_path(self.downloaded_videos_excel) as tmp_path:
+                        df.to_excel(tmp_path, index=False)
+            return initial_count - len(df)  # Return number of removed entries
                 
         except Exception as e:
             st.error(f"Error cleaning downloaded videos Excel: {str(e)}")
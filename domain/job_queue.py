@@ -0,0 +1,567 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+# Pipeline stages in order; a finished job submits the next stage when chained
+STAGES = ('download', 'convert', 'transcribe', 'split')
+NEXT_STAGE = {'download': 'convert', 'convert': 'transcribe', 'transcribe': 'split'}
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'skipped')
+
+# Stages that report progress while running; convert is one opaque ffmpeg call
+PROGRESS_STAGES = ('download', 'transcribe', 'split')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    stage TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    params TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    priority INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claim TEXT,
+    worker TEXT,
+    audio_seconds REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_stage ON jobs(status, stage, priority, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_video ON jobs(video_id, stage);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at);
+
+CREATE TABLE IF NOT EXISTS workers (
+    name TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    pid INTEGER,
+    current_job INTEGER,
+    started_at REAL,
+    heartbeat_at REAL
+);
+"""
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of a list, or None if it is empty."""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+class JobStore:
+    """Persistent pipeline job queue in SQLite.
+
+    Jobs survive Streamlit reruns, sessions and restarts. Any number of
+    threads or processes can claim work: a claim is a single UPDATE, so two
+    workers never run the same job.
+    """
+
+    _init_lock = threading.Lock()
+
+    # A job interrupted this many times (e.g. it keeps crashing its process) fails
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, db_path='data/jobs.db'):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._init_lock:
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a transaction on a fresh connection, so threads never share one."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params']) if job['params'] else {}
+        return job
+
+    def submit(self, stage, video_id, params=None, priority=0):
+        """Queue a job; returns its ID.
+
+        If the video already has a queued or running job for the stage, that
+        job's ID is returned instead of queueing a duplicate.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        with self._connect() as conn:
+            return self._submit(conn, stage, video_id, params, priority)
+
+    @staticmethod
+    def _submit(conn, stage, video_id, params, priority):
+        existing = conn.execute(
+            "SELECT id FROM jobs WHERE video_id = ? AND stage = ? AND status IN ('queued', 'running')",
+            (video_id, stage)
+        ).fetchone()
+        if existing:
+            return existing['id']
+        cursor = conn.execute(
+            'INSERT INTO jobs (stage, video_id, params, priority, enqueued_at) VALUES (?, ?, ?, ?, ?)',
+            (stage, video_id, json.dumps(params or {}), priority, time.time())
+        )
+        return cursor.lastrowid
+
+    def claim(self, stage, worker):
+        """Mark the next queued job of a stage as running and return it, or None."""
+        token = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'running', claim = ?, worker = ?, started_at = ?,
+                                attempts = attempts + 1, progress = 0
+                WHERE id = (
+                    SELECT id FROM jobs WHERE status = 'queued' AND stage = ?
+                    ORDER BY priority DESC, id LIMIT 1
+                ) AND status = 'queued'
+                """,
+                (token, worker, time.time(), stage)
+            )
+            row = conn.execute('SELECT * FROM jobs WHERE claim = ?', (token,)).fetchone()
+        return self._to_job(row)
+
+    def set_progress(self, job, progress):
+        """Update a claimed job's progress; ignored once the claim was lost."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ? AND claim = ? AND status = 'running'",
+                (float(progress), job['id'], job['claim'])
+            )
+
+    def finish(self, job, status, error=None, audio_seconds=None, next_stage=None):
+        """Record the outcome of a claimed job: done, failed or skipped.
+
+        Args:
+            job: The job as returned by claim
+            status: 'done', 'failed' or 'skipped'
+            error: Error or skip message
+            audio_seconds: Duration of the processed audio, for throughput stats
+            next_stage: Stage to queue for the video in the same transaction
+
+        Returns:
+            bool: False if the job was requeued and claimed again meanwhile,
+            in which case nothing is recorded
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, audio_seconds = ?, finished_at = ?, '
+                'progress = CASE WHEN ? = \'done\' THEN 1 ELSE progress END '
+                "WHERE id = ? AND claim = ? AND status = 'running'",
+                (status, error, audio_seconds, time.time(), status, job['id'], job['claim'])
+            )
+            if cursor.rowcount == 0:
+                return False
+            if next_stage:
+                self._submit(conn, next_stage, job['video_id'], job['params'], job['priority'])
+        return True
+
+    def retry(self, job_id):
+        """Queue a failed job again."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = NULL, progress = 0, claim = NULL, attempts = 0, "
+                "started_at = NULL, finished_at = NULL WHERE id = ? AND status = 'failed'",
+                (job_id,)
+            )
+
+    def requeue_stale(self, max_age=120):
+        """Queue again running jobs whose worker stopped sending heartbeats.
+
+        Covers workers of crashed or restarted processes; returns the number
+        of jobs requeued. Jobs interrupted MAX_ATTEMPTS times are marked
+        failed instead, so a job that crashes its process doesn't loop.
+        """
+        now = time.time()
+        cutoff = now - max_age
+        stale = """
+            status = 'running' AND (
+                worker IS NULL OR worker NOT IN (SELECT name FROM workers WHERE heartbeat_at >= ?)
+            )
+        """
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+                UPDATE jobs SET status = 'failed', claim = NULL, finished_at = ?,
+                                error = 'Interrupted ' || attempts || ' times; giving up'
+                WHERE {stale} AND attempts >= ?
+                """,
+                (now, cutoff, self.MAX_ATTEMPTS)
+            )
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = 'queued', claim = NULL, progress = 0 WHERE {stale}",
+                (cutoff,)
+            )
+            conn.execute('DELETE FROM workers WHERE heartbeat_at < ?', (cutoff,))
+        return cursor.rowcount
+
+    def touch_workers(self, worker_prefix):
+        """Refresh the heartbeat of every worker whose name starts with worker_prefix."""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE workers SET heartbeat_at = ? WHERE name LIKE ?',
+                (time.time(), f"{worker_prefix}%")
+            )
+
+    def get_workers(self, max_age=120):
+        """Get workers that sent a heartbeat recently."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT * FROM workers WHERE heartbeat_at >= ? ORDER BY stage, name',
+                (time.time() - max_age,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_job(self, job_id):
+        with self._connect() as conn:
+            return self._to_job(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+
+    def get_latest_jobs(self, video_ids):
+        """Get the most recent job of each video in one query."""
+        video_ids = list(video_ids)
+        if not video_ids:
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM jobs WHERE id IN (
+                    SELECT MAX(id) FROM jobs
+                    WHERE video_id IN (SELECT value FROM json_each(?))
+                    GROUP BY video_id
+                )
+                """,
+                (json.dumps(video_ids),)
+            ).fetchall()
+        return {row['video_id']: self._to_job(row) for row in rows}
+
+    def get_jobs(self, status=None, stage=None, limit=100):
+        """Get recent jobs, newest first, optionally filtered."""
+        clauses, params = [], []
+        if status:
+            clauses.append('status = ?')
+            params.append(status)
+        if stage:
+            clauses.append('stage = ?')
+            params.append(stage)
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM jobs{where} ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def get_counts(self):
+        """Count jobs by stage and status: {stage: {status: count}}."""
+        counts = {stage: {status: 0 for status in JOB_STATUSES} for stage in STAGES}
+        with self._connect() as conn:
+            for row in conn.execute('SELECT stage, status, COUNT(*) AS n FROM jobs GROUP BY stage, status'):
+                counts.setdefault(row['stage'], {})[row['status']] = row['n']
+        return counts
+
+    def get_stats(self, window=3600, worker_max_age=120):
+        """Throughput, latency and worker utilization per stage.
+
+        Args:
+            window: Look back this many seconds (shortened to the workers' uptime)
+            worker_max_age: Workers without a heartbeat for this long count as gone
+
+        Returns:
+            dict: stage -> {'done', 'failed', 'videos_per_hour', 'audio_hours_per_hour',
+            'run_p50', 'run_p95', 'wait_p50', 'wait_p95', 'workers', 'busy_workers',
+            'utilization'}; latencies in seconds, None without finished jobs
+        """
+        now = time.time()
+        since = now - window
+        with self._connect() as conn:
+            jobs = conn.execute(
+                'SELECT stage, status, video_id, audio_seconds, enqueued_at, started_at, finished_at '
+                "FROM jobs WHERE finished_at >= ? OR status = 'running'",
+                (since,)
+            ).fetchall()
+            workers = conn.execute(
+                'SELECT stage, current_job, started_at FROM workers WHERE heartbeat_at >= ?',
+                (now - worker_max_age,)
+            ).fetchall()
+
+        stats = {}
+        for stage in STAGES:
+            stage_workers = [row for row in workers if row['stage'] == stage]
+            # Don't count time before the workers existed as idle
+            started = min((row['started_at'] for row in stage_workers), default=since)
+            span = max(now - max(since, started), 1.0)
+
+            done_videos, audio_seconds, busy_seconds = set(), 0.0, 0.0
+            run_times, wait_times = [], []
+            counts = {'done': 0, 'failed': 0}
+            for job in jobs:
+                if job['stage'] != stage or job['started_at'] is None:
+                    continue
+                end = job['finished_at'] or now
+                busy_seconds += max(0.0, end - max(job['started_at'], since))
+                if job['status'] == 'running':
+                    continue
+                if job['status'] in counts:
+                    counts[job['status']] += 1
+                run_times.append(job['finished_at'] - job['started_at'])
+                wait_times.append(job['started_at'] - job['enqueued_at'])
+                if job['status'] == 'done':
+                    done_videos.add(job['video_id'])
+                    audio_seconds += job['audio_seconds'] or 0.0
+
+            hours = span / 3600
+            stats[stage] = {
+                **counts,
+                'videos_per_hour': len(done_videos) / hours,
+                'audio_hours_per_hour': audio_seconds / 3600 / hours,
+                'run_p50': _percentile(run_times, 50),
+                'run_p95': _percentile(run_times, 95),
+                'wait_p50': _percentile(wait_times, 50),
+                'wait_p95': _percentile(wait_times, 95),
+                'workers': len(stage_workers),
+                'busy_workers': sum(1 for row in stage_workers if row['current_job'] is not None),
+                'utilization': min(busy_seconds / (len(stage_workers) * span), 1.0) if stage_workers else None,
+            }
+        return stats
+
+    def get_completion_rate(self, window=3600, worker_max_age=120):
+        """Videos per hour that finished the last stage they were queued for.
+
+        A done job is final unless it chained into a following stage, so
+        videos only downloaded or only transcribed count as well as those
+        that went through the whole pipeline.
+        """
+        now = time.time()
+        since = now - window
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT video_id, stage, params FROM jobs WHERE status = 'done' AND finished_at >= ?",
+                (since,)
+            ).fetchall()
+            started = conn.execute(
+                'SELECT MIN(started_at) AS started FROM workers WHERE heartbeat_at >= ?',
+                (now - worker_max_age,)
+            ).fetchone()['started']
+        completed = {
+            row['video_id'] for row in rows
+            if row['stage'] not in NEXT_STAGE or not json.loads(row['params'] or '{}').get('chain')
+        }
+        span = max(now - max(since, started or since), 1.0)
+        return len(completed) / (span / 3600)
+
+    def heartbeat(self, worker, stage, current_job=None):
+        """Record that a worker is alive and what it is running."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO workers (name, stage, pid, current_job, started_at, heartbeat_at) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET current_job = excluded.current_job, heartbeat_at = excluded.heartbeat_at',
+                (worker, stage, os.getpid(), current_job, now, now)
+            )
+
+
+class JobRunner:
+    """Worker threads that drain the job store, one pool per stage.
+
+    Runs independently of any Streamlit session, so work continues when the
+    user navigates away, and several processes may run workers against the
+    same data directory. API keys come from the configuration (.env or the
+    environment) when a job runs, never from whichever session started it.
+    """
+
+    DEFAULT_WORKERS = {'download': 2, 'convert': 2, 'transcribe': 2, 'split': 2}
+    POLL_INTERVAL = 1.0
+    HEARTBEAT_INTERVAL = 15
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, data_dir='data', workers=None):
+        self.data_dir = Path(data_dir)
+        self.store = get_job_store(self.data_dir / 'jobs.db')
+        self.workers = dict(self.DEFAULT_WORKERS)
+        for stage in STAGES:
+            value = os.getenv(f"JOB_WORKERS_{stage.upper()}")
+            if value:
+                self.workers[stage] = int(value)
+        self.workers.update(workers or {})
+        self.name_prefix = f"{socket.gethostname()}:{os.getpid()}:"
+        self._threads = []
+        self._start_lock = threading.Lock()
+
+    def get_source_path(self, video_id):
+        return self.data_dir / 'final_result' / video_id / 'original' / f"{video_id}.mp3"
+
+    def _progress_callback(self, job, scale=1.0):
+        """Build a progress callback that writes to the store at most once a second."""
+        last = {'time': 0.0, 'progress': None}
+
+        def update(value):
+            progress = float(value) / scale
+            now = time.monotonic()
+            if progress == last['progress'] or (now - last['time'] < self.PROGRESS_INTERVAL and progress < 1):
+                return
+            last['time'], last['progress'] = now, progress
+            self.store.set_progress(job, progress)
+        return update
+
+    def _run_download(self, job):
+        from domain.config_service import ConfigService
+        from domain.youtube_service import YouTubeService
+        youtube_service = YouTubeService(ConfigService().get_youtube_api_key())
+        result = youtube_service.download_audio(
+            job['video_id'],
+            progress_callback=self._progress_callback(job, scale=100)
+        )
+        return result['success'], result.get('error', 'Downloaded')
+
+    def _run_convert(self, job):
+        from domain.audio_service import AudioService
+        return AudioService().convert_to_ogg(str(self.get_source_path(job['video_id'])), job['video_id'])
+
+    def _run_transcribe(self, job):
+        from domain.config_service import ConfigService
+        from domain.transcription_service import TranscriptionService
+        # Read per job, so a key saved in the settings applies to queued work too
+        api_key = ConfigService().get_openai_api_key() or None
+        service = TranscriptionService(data_dir=str(self.data_dir), api_key=api_key)
+        return service.transcribe_audio(
+            str(self.get_source_path(job['video_id'])),
+            job['video_id'],
+            language=job['params'].get('language'),
+            redetect=job['params'].get('redetect', False),
+            progress_callback=self._progress_callback(job)
+        )
+
+    def _run_split(self, job):
+        from domain.audio_splitter import AudioSplitter
+        return AudioSplitter().split_audio(
+            str(self.get_source_path(job['video_id'])), job['video_id'], 'wav',
+            progress_callback=self._progress_callback(job)
+        )
+
+    def run_job(self, job):
+        """Run one claimed job and record its outcome."""
+        from domain.artifact_index import get_artifact_index
+        from utils.ffmpeg import probe_audio
+
+        video_id = job['video_id']
+        try:
+            success, message = getattr(self, f"_run_{job['stage']}")(job)
+            if success:
+                status, error = 'done', None
+            elif isinstance(message, dict) and message.get('skipped'):
+                status, error = 'skipped', message['error']
+            else:
+                status, error = 'failed', str(message)
+        except Exception as e:
+            status, error = 'failed', str(e)
+
+        audio_seconds = None
+        if status == 'done':
+            try:
+                audio_seconds = probe_audio(self.get_source_path(video_id))['duration']
+            except Exception:
+                pass
+
+        try:
+            get_artifact_index(self.data_dir).refresh_video(video_id)
+        except Exception as e:
+            print(f"[WARNING] Could not refresh artifacts of {video_id}: {e}")
+
+        # Queue the next stage in the same transaction, so the video never looks idle in between
+        next_stage = NEXT_STAGE.get(job['stage'])
+        if status != 'done' or not job['params'].get('chain'):
+            next_stage = None
+        if not self.store.finish(job, status, error=error, audio_seconds=audio_seconds, next_stage=next_stage):
+            print(f"[WARNING] Job {job['id']} was requeued while running; dropping its outcome")
+            return None
+        print(f"[DEBUG] Job {job['id']} ({job['stage']} {video_id}) finished: {status}")
+        return status
+
+    def _worker(self, stage, name):
+        while True:
+            try:
+                self.store.heartbeat(name, stage)
+                job = self.store.claim(stage, name)
+                if job is None:
+                    time.sleep(self.POLL_INTERVAL)
+                    continue
+                self.store.heartbeat(name, stage, job['id'])
+                self.run_job(job)
+            except Exception as e:
+                print(f"[ERROR] Worker {name} failed: {e}")
+                time.sleep(self.POLL_INTERVAL)
+
+    def _heartbeat(self):
+        """Keep busy workers alive in the store and recover jobs of dead ones."""
+        while True:
+            try:
+                self.store.touch_workers(self.name_prefix)
+                requeued = self.store.requeue_stale()
+                if requeued:
+                    print(f"[DEBUG] Requeued {requeued} interrupted jobs")
+            except Exception as e:
+                print(f"[ERROR] Job heartbeat failed: {e}")
+            time.sleep(self.HEARTBEAT_INTERVAL)
+
+    def start(self):
+        """Start the worker pools once per process."""
+        # Sessions run in their own threads, so two first reruns may race here
+        with self._start_lock:
+            if self._threads:
+                return False
+            heartbeat = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+            heartbeat.start()
+            self._threads.append(heartbeat)
+            for stage in STAGES:
+                for i in range(self.workers[stage]):
+                    name = f"{self.name_prefix}{stage}-{i}"
+                    thread = threading.Thread(target=self._worker, args=(stage, name), name=f"job-{stage}-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            return True
+
+
+# One store per database file and one runner per data directory, per process
+_stores = {}
+_runners = {}
+_singletons_lock = threading.RLock()
+
+
+def get_job_store(db_path='data/jobs.db'):
+    """Get the process-wide job store for a database file."""
+    key = str(Path(db_path).resolve())
+    with _singletons_lock:
+        if key not in _stores:
+            _stores[key] = JobStore(db_path)
+        return _stores[key]
+
+
+def get_job_runner(data_dir='data'):
+    """Get the process-wide, running job runner for a data directory."""
+    key = str(Path(data_dir).resolve())
+    with _singletons_lock:
+        runner = _runners.get(key)
+        if runner is None:
+            runner = _runners[key] = JobRunner(data_dir=data_dir)
+    runner.start()
+    return runner
@@ -0,0 +1,265 @@
+"""Export a corpus manifest: one row per transcription segment with video metadata.
+
+Output is a Hive-partitioned Parquet dataset (`video_id=<id>/segments.parquet`,
+readable with `pq.read_table(output_dir)`), plus a separate tree of
+`video_id=<id>/segments.jsonl` files with --jsonl. Re-runs only rewrite
+videos whose transcription, splits or catalog entry changed since the last
+export. Segments are streamed from each transcription in record batches, so
+memory stays bounded by the batch size rather than the corpus size.
+
+Run with:
+
+    python -m domain.manifest_export --output data/export/manifest --jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
+from domain.catalog import PUBLISHED_AT_FORMAT, VideoCatalog
+from domain.reconciliation import scan_storage
+from domain.transcription_store import TranscriptionStore
+from utils.atomic_io import atomic_path, atomic_write, write_json
+
+MANIFEST_SCHEMA = pa.schema([
+    ('video_id', pa.string()),
+    ('segment_index', pa.int32()),
+    ('start_time_seconds', pa.float64()),
+    ('end_time_seconds', pa.float64()),
+    ('duration_seconds', pa.float64()),
+    ('text', pa.string()),
+    ('language', pa.string()),
+    ('audio_file', pa.string()),
+    ('transcribed_at', pa.string()),
+    ('title', pa.string()),
+    ('channel_title', pa.string()),
+    ('published_at', pa.timestamp('us', tz='UTC')),
+    ('video_duration_seconds', pa.int32()),
+    ('license', pa.string()),
+])
+
+# The partition directory supplies video_id, so Parquet files store the rest
+FILE_SCHEMA = pa.schema([field for field in MANIFEST_SCHEMA if field.name != 'video_id'])
+
+SEGMENT_COLUMNS = ['start_time_seconds', 'end_time_seconds', 'duration_seconds', 'text', 'language', 'audio_file']
+STATE_FILE = '_export_state.json'
+PARTITION_PREFIX = 'video_id='
+# Bump when the output layout changes, so the next run rewrites every partition
+FORMAT_VERSION = 2
+
+
+def _parse_published_at(value):
+    """Parse a catalog published_at string to a UTC datetime, or None."""
+    try:
+        return datetime.strptime(value, PUBLISHED_AT_FORMAT).replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+class ManifestExporter:
+    def __init__(self, data_dir='data', output_dir=None, jsonl=False, batch_size=10000, jsonl_dir=None):
+        """Initialize the exporter.
+
+        Args:
+            data_dir: Data directory holding catalog.db and final_result/
+            output_dir: Where to write the manifest (default: <data_dir>/export/manifest)
+            jsonl: Also write a JSONL copy of every partition
+            batch_size: Maximum number of segments held in memory at once
+            jsonl_dir: Where to write the JSONL copy (default: <output_dir>_jsonl),
+                kept apart so the Parquet directory stays a clean dataset
+        """
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir) if output_dir else self.data_dir / 'export' / 'manifest'
+        self.jsonl_dir = Path(jsonl_dir) if jsonl_dir else self.output_dir.with_name(f"{self.output_dir.name}_jsonl")
+        self.jsonl = jsonl
+        self.batch_size = batch_size
+        self.catalog = VideoCatalog(self.data_dir / 'catalog.db')
+        self.store = TranscriptionStore(self.data_dir / 'final_result')
+        self.state_path = self.output_dir / STATE_FILE
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def get_partition_dir(self, video_id, root=None):
+        return (root or self.output_dir) / f"{PARTITION_PREFIX}{video_id}"
+
+    def _partition_ids(self):
+        """Video IDs of the partitions currently on disk."""
+        video_ids = set()
+        for root in (self.output_dir, self.jsonl_dir):
+            try:
+                video_ids.update(
+                    entry.name[len(PARTITION_PREFIX):] for entry in os.scandir(root)
+                    if entry.is_dir() and entry.name.startswith(PARTITION_PREFIX)
+                )
+            except FileNotFoundError:
+                pass
+        return video_ids
+
+    def _remove_partition(self, video_id):
+        shutil.rmtree(self.get_partition_dir(video_id), ignore_errors=True)
+        shutil.rmtree(self.get_partition_dir(video_id, self.jsonl_dir), ignore_errors=True)
+
+    def _signature(self, video_id, video):
+        """Fingerprint everything a video's manifest rows are built from."""
+        transcription = os.stat(self.store.get_path(video_id))
+        try:
+            split_mtime = os.stat(self.data_dir / 'final_result' / video_id / 'split').st_mtime_ns
+        except FileNotFoundError:
+            split_mtime = None
+        metadata = hashlib.sha1(json.dumps(video, sort_keys=True, default=str).encode()).hexdigest()
+        return [transcription.st_mtime_ns, transcription.st_size, split_mtime, metadata, self.jsonl, FORMAT_VERSION]
+
+    def _video_columns(self, video_id, video, rows):
+        """Build the constant per-video columns for a batch of rows."""
+        published_at = video.get('published_at')
+        return {
+            'video_id': pa.array([video_id] * rows, pa.string()),
+            'title': pa.array([video.get('title')] * rows, pa.string()),
+            'channel_title': pa.array([video.get('channel_title')] * rows, pa.string()),
+            'published_at': pa.array(
+                [_parse_published_at(published_at)] * rows,
+                pa.timestamp('us', tz='UTC')
+            ),
+            'video_duration_seconds': pa.array([video.get('duration_seconds')] * rows, pa.int32()),
+            'license': pa.array([video.get('license')] * rows, pa.string()),
+        }
+
+    def _batches(self, video_id, video):
+        """Yield manifest record batches for one video."""
+        parquet_file = pq.ParquetFile(self.store.get_path(video_id))
+        available = set(parquet_file.schema_arrow.names)
+        offset = 0
+        for batch in parquet_file.iter_batches(batch_size=self.batch_size):
+            rows = batch.num_rows
+            columns = self._video_columns(video_id, video, rows)
+            columns['segment_index'] = pa.array(range(offset, offset + rows), pa.int32())
+            for column in SEGMENT_COLUMNS:
+                field_type = MANIFEST_SCHEMA.field(column).type
+                columns[column] = (
+                    batch.column(column).cast(field_type) if column in available
+                    else pa.nulls(rows, field_type)
+                )
+            columns['transcribed_at'] = (
+                batch.column('timestamp').cast(pa.string()) if 'timestamp' in available
+                else pa.nulls(rows, pa.string())
+            )
+            offset += rows
+            yield pa.RecordBatch.from_arrays(
+                [columns[field.name] for field in MANIFEST_SCHEMA], schema=MANIFEST_SCHEMA
+            )
+
+    @staticmethod
+    def _file_batch(batch):
+        """Drop the partition column from a manifest batch."""
+        return pa.RecordBatch.from_arrays(
+            [batch.column(field.name) for field in FILE_SCHEMA], schema=FILE_SCHEMA
+        )
+
+    def export_video(self, video_id, video):
+        """Write one video's partition; returns the number of segments."""
+        partition_dir = self.get_partition_dir(video_id)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        jsonl_dir = self.get_partition_dir(video_id, self.jsonl_dir)
+        # JSONL written inside Parquet partitions by earlier versions
+        if (partition_dir / 'segments.jsonl').exists():
+            os.remove(partition_dir / 'segments.jsonl')
+
+        segments = 0
+        with atomic_path(partition_dir / 'segments.parquet') as parquet_tmp:
+            with pq.ParquetWriter(parquet_tmp, FILE_SCHEMA) as writer:
+                if self.jsonl:
+                    jsonl_dir.mkdir(parents=True, exist_ok=True)
+                    with atomic_write(jsonl_dir / 'segments.jsonl') as jsonl_file:
+                        for batch in self._batches(video_id, video):
+                            writer.write_batch(self._file_batch(batch))
+                            for record in batch.to_pylist():
+                                jsonl_file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                            segments += batch.num_rows
+                else:
+                    for batch in self._batches(video_id, video):
+                        writer.write_batch(self._file_batch(batch))
+                        segments += batch.num_rows
+        if not self.jsonl:
+            shutil.rmtree(jsonl_dir, ignore_errors=True)
+        return segments
+
+    def export(self, full=False):
+        """Export changed videos and drop partitions of removed ones.
+
+        Args:
+            full: Ignore the previous export state and rewrite every video
+
+        Returns:
+            dict: Counts of exported, unchanged, removed and failed videos and exported segments
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        previous_state = self._load_state()
+        state = {} if full else previous_state
+        summary = {'exported': 0, 'unchanged': 0, 'removed': 0, 'failed': 0, 'segments': 0}
+        last_saved = 0
+
+        transcribed = sorted(scan_storage(self.data_dir)['transcribed'])
+        for video_id in transcribed:
+            try:
+                if not self.store.get_path(video_id).exists():
+                    # Legacy CSV transcriptions are converted before streaming
+                    self.store.migrate(video_id)
+                video = self.catalog.get(video_id) or {}
+                signature = self._signature(video_id, video)
+                if state.get(video_id) == signature:
+                    summary['unchanged'] += 1
+                    continue
+                summary['segments'] += self.export_video(video_id, video)
+                state[video_id] = signature
+                summary['exported'] += 1
+            except Exception as e:
+                print(f"[ERROR] Failed to export {video_id}: {e}")
+                summary['failed'] += 1
+                continue
+            # Save progress every 100 exports, so an interrupted export resumes
+            if summary['exported'] - last_saved >= 100:
+                write_json(self.state_path, state)
+                last_saved = summary['exported']
+
+        # Prune against what is on disk too, since a full run starts without state
+        for video_id in (set(previous_state) | self._partition_ids()) - set(transcribed):
+            self._remove_partition(video_id)
+            state.pop(video_id, None)
+            summary['removed'] += 1
+
+        write_json(self.state_path, state)
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a per-segment corpus manifest')
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--output', default=None, help='Output directory (default: <data-dir>/export/manifest)')
+    parser.add_argument('--jsonl', action='store_true', help='Also write a JSONL copy of every partition')
+    parser.add_argument('--jsonl-output', default=None, help='JSONL output directory (default: <output>_jsonl)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Segments per record batch')
+    parser.add_argument('--full', action='store_true', help='Re-export every video, ignoring previous state')
+    args = parser.parse_args()
+
+    exporter = ManifestExporter(
+        args.data_dir, args.output, jsonl=args.jsonl, batch_size=args.batch_size, jsonl_dir=args.jsonl_output
+    )
+    summary = exporter.export(full=args.full)
+    print(
+        f"Exported {summary['exported']} videos ({summary['segments']} segments), "
+        f"{summary['unchanged']} unchanged, {summary['removed']} removed, {summary['failed']} failed "
+        f"-> {exporter.output_dir}"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import threading
+import time
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter that adapts to how the remote API is coping.
+
+    The limit grows additively while calls succeed and is halved when the
+    API throttles (429) or fails server-side (5xx), which keeps the number of
+    requests in flight close to what the service can sustain.
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=8, base_delay=1.0, max_delay=60.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self._backoff_until = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request slot is free and no backoff is active."""
+        with self._condition:
+            while True:
+                wait = self._backoff_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """Grow the limit by roughly one slot per window of successful calls."""
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._condition.notify_all()
+
+    def on_throttle(self, attempt, retry_after=None):
+        """Halve the limit and pause new requests for a backoff interval."""
+        with self._condition:
+            self.limit = max(self.minimum, self.limit / 2)
+            delay = retry_after if retry_after else min(self.max_delay, self.base_delay * (2 ** attempt))
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+            self._condition.notify_all()
+
+    def call(self, fn, is_retryable, max_retries=5):
+        """Run fn under the limiter, retrying throttled or transient failures."""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                self.release()
+                if attempt >= max_retries or not is_retryable(e):
+                    raise
+                print(f"[WARNING] Retrying after API error (attempt {attempt + 1}): {str(e)}")
+                self.on_throttle(attempt, _retry_after(e))
+                attempt += 1
+                continue
+            self.release()
+            self.on_success()
+            return result
+
+
+def _retry_after(error):
+    """Read a Retry-After header from an API error, if there is one."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+STAGES = ('downloaded', 'converted', 'transcribed', 'split')
+
+SPLIT_EXTENSIONS = ('.mp3', '.ogg', '.wav')
+
+
+def _list_dir(path):
+    """List entry names of a directory, or an empty list if it is missing."""
+    try:
+        return os.listdir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def scan_storage(data_dir='data'):
+    """Scan the storage tree once and return the set of video IDs per stage.
+
+    Layout:
+        downloaded:  final_result/<id>/original/<id>.mp3
+        converted:   converted/<id>.ogg
+        transcribed: final_result/<id>/<id>_transcription.parquet (or .csv)
+        split:       final_result/<id>/split/ holding any audio file
+    """
+    data_dir = Path(data_dir)
+    stages = {stage: set() for stage in STAGES}
+
+    for name in _list_dir(data_dir / 'converted'):
+        if name.endswith('.ogg'):
+            stages['converted'].add(name[:-len('.ogg')])
+
+    final_result_dir = data_dir / 'final_result'
+    try:
+        video_dirs = [entry for entry in os.scandir(final_result_dir) if entry.is_dir()]
+    except FileNotFoundError:
+        video_dirs = []
+
+    for video_dir in video_dirs:
+        video_id = video_dir.name
+        names = set(_list_dir(video_dir.path))
+        if f"{video_id}_transcription.parquet" in names or f"{video_id}_transcription.csv" in names:
+            stages['transcribed'].add(video_id)
+        if 'original' in names and f"{video_id}.mp3" in _list_dir(os.path.join(video_dir.path, 'original')):
+            stages['downloaded'].add(video_id)
+        if 'split' in names and any(
+            name.endswith(SPLIT_EXTENSIONS) for name in _list_dir(os.path.join(video_dir.path, 'split'))
+        ):
+            stages['split'].add(video_id)
+
+    return stages
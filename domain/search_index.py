@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    segment_index INTEGER NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    audio_file TEXT,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_segments_video ON segments(video_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text,
+    content='segments',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+
+CREATE TABLE IF NOT EXISTS indexed_videos (
+    video_id TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+"""
+
+
+class SearchIndex:
+    """SQLite FTS5 full-text index over every transcription segment.
+
+    Segment rows live in a regular table indexed by video_id, so replacing
+    one video's segments is cheap; the FTS5 table indexes their text and
+    is kept in sync by triggers.
+    """
+
+    _init_lock = threading.Lock()
+
+    def __init__(self, db_path='data/search_index.db'):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._init_lock:
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+        self.synced = False
+        self._sync_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        """Open a transaction on a fresh connection, so threads never share one."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def update_video(self, video_id, segments_df, source_stat=None):
+        """Replace the indexed segments of a video."""
+        rows = [
+            (
+                video_id,
+                int(i),
+                float(row['start_time_seconds']),
+                float(row['end_time_seconds']),
+                row['audio_file'] if isinstance(row.get('audio_file'), str) else None,
+                str(row['text']) if row['text'] is not None else ''
+            )
+            for i, row in enumerate(segments_df.to_dict('records'))
+        ]
+        with self._connect() as conn:
+            conn.execute('DELETE FROM segments WHERE video_id = ?', (video_id,))
+            conn.executemany(
+                'INSERT INTO segments (video_id, segment_index, start_time, end_time, audio_file, text) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO indexed_videos (video_id, mtime_ns, size) VALUES (?, ?, ?)',
+                (video_id, source_stat.st_mtime_ns if source_stat else None,
+                 source_stat.st_size if source_stat else None)
+            )
+
+    def remove_video(self, video_id):
+        """Remove a video's segments from the index."""
+        self.remove_videos([video_id])
+
+    def remove_videos(self, video_ids):
+        """Remove the segments of many videos in one transaction."""
+        video_ids = json.dumps(list(video_ids))
+        with self._connect() as conn:
+            conn.execute('DELETE FROM segments WHERE video_id IN (SELECT value FROM json_each(?))', (video_ids,))
+            conn.execute('DELETE FROM indexed_videos WHERE video_id IN (SELECT value FROM json_each(?))', (video_ids,))
+
+    @staticmethod
+    def _to_match_query(query):
+        """Turn free text into an FTS5 query matching all words."""
+        terms = [term.replace('"', '""') for term in query.split()]
+        return ' '.join(f'"{term}"' for term in terms)
+
+    def search(self, query, limit=50):
+        """Search segment text; returns best matches first."""
+        match_query = self._to_match_query(query)
+        if not match_query:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.video_id, s.segment_index, s.start_time, s.end_time, s.audio_file, s.text,
+                       snippet(segments_fts, 0, '**', '**', '…', 16) AS snippet
+                FROM segments_fts
+                JOIN segments s ON s.id = segments_fts.rowid
+                WHERE segments_fts MATCH ?
+                ORDER BY bm25(segments_fts)
+                LIMIT ?
+                """,
+                (match_query, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def sync(self, store, video_ids, prune=False):
+        """Index transcriptions that changed since they were last indexed.
+
+        Args:
+            store: TranscriptionStore to read transcriptions from
+            video_ids: Videos to check
+            prune: Also drop indexed videos missing from video_ids, e.g.
+                when video_ids lists every video on disk
+
+        Returns the number of videos (re)indexed or removed.
+        """
+        video_ids = list(video_ids)
+        with self._connect() as conn:
+            indexed = {
+                row['video_id']: (row['mtime_ns'], row['size'])
+                for row in conn.execute('SELECT video_id, mtime_ns, size FROM indexed_videos')
+            }
+
+        updated = 0
+        for video_id in video_ids:
+            if not store.exists(video_id):
+                if video_id in indexed:
+                    self.remove_video(video_id)
+                    updated += 1
+                continue
+            path = store.get_path(video_id)
+            if not path.exists():
+                # Reading migrates a legacy CSV, which indexes it through the store
+                store.read(video_id)
+                updated += 1
+                continue
+            stat = os.stat(path)
+            if indexed.get(video_id) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            self.update_video(video_id, store.read(video_id), stat)
+            updated += 1
+
+        if prune:
+            removed = set(indexed) - set(video_ids)
+            if removed:
+                self.remove_videos(removed)
+                updated += len(removed)
+        return updated
+
+    def sync_once(self, store, video_ids):
+        """Bring the index up to date with the store once per process.
+
+        Transcriptions written later are indexed by the store itself, so a
+        single pruning sync when search is first used is enough.
+        """
+        with self._sync_lock:
+            if self.synced:
+                return 0
+            updated = self.sync(store, video_ids, prune=True)
+            self.synced = True
+            return updated
+
+
+# One index per database file, shared by every store in the process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(db_path='data/search_index.db'):
+    """Get the process-wide search index for a database file."""
+    key = str(Path(db_path).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SearchIndex(db_path)
+        return _indexes[key]
@@ -0,0 +1,150 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from domain.rate_limiter import AdaptiveLimiter
+
+# Shared by every backend in the process so concurrent transcriptions
+# draw from one request budget
+transcription_limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=8)
+
+
+class TranscriptionBackend:
+    """Interface for engines that turn audio into Whisper verbose JSON.
+
+    A request is a dict with `file` as a (filename, bytes) tuple plus the
+    `language` and `response_format` options. Results are plain dicts with
+    `text`, `language` and a list of `segments` (start, end, text).
+    """
+
+    name = 'base'
+
+    def __init__(self, model, limiter=None, max_concurrency=8):
+        self.model = model
+        self.limiter = limiter or transcription_limiter
+        self.max_concurrency = max_concurrency
+
+    def transcribe(self, request):
+        """Transcribe a single request and return the result dict."""
+        raise NotImplementedError
+
+    def is_retryable(self, error):
+        """Check if an error is a throttle or transient failure worth retrying."""
+        return False
+
+    def transcribe_batch(self, requests):
+        """Transcribe many requests as one job.
+
+        Returns one entry per request, in order: the result dict, or the
+        exception that request failed with. The default runs requests
+        concurrently through the adaptive limiter.
+        """
+        if not requests:
+            return []
+
+        def run(request):
+            try:
+                return self.limiter.call(lambda: self.transcribe(request), self.is_retryable)
+            except Exception as e:
+                return e
+
+        workers = max(1, min(len(requests), self.max_concurrency))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, requests))
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """OpenAI Whisper API, or any OpenAI-compatible server via base_url."""
+
+    name = 'openai'
+
+    def __init__(self, api_key=None, base_url=None, model='whisper-1', **kwargs):
+        super().__init__(model, **kwargs)
+        from openai import OpenAI
+        # Without a key the client falls back to OPENAI_API_KEY; only a custom
+        # server (e.g. the local stub) may run without any key at all
+        if not api_key and base_url is not None:
+            api_key = os.getenv('OPENAI_API_KEY') or 'not-needed'
+        # Retries are left to the adaptive limiter so it can see throttling
+        self.client = OpenAI(api_key=api_key or None, base_url=base_url, max_retries=0)
+
+    def transcribe(self, request):
+        options = {
+            'model': self.model,
+            'file': request['file'],
+            'response_format': request.get('response_format', 'verbose_json'),
+        }
+        if request.get('language'):
+            options['language'] = request['language']
+        transcript = self.client.audio.transcriptions.create(**options)
+        return transcript.model_dump()
+
+    def is_retryable(self, error):
+        from openai import APIConnectionError, APITimeoutError
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        status = getattr(error, 'status_code', None)
+        return status == 429 or (status is not None and status >= 500)
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """Self-hosted CPU engine using faster-whisper (optional dependency).
+
+    The model is loaded once per process and a batch runs in-process one
+    request after another, since the engine already uses every core.
+    """
+
+    name = 'local'
+    _models = {}
+
+    def __init__(self, model='small', compute_type='int8', **kwargs):
+        super().__init__(model, **kwargs)
+        self.compute_type = compute_type
+
+    def _get_model(self):
+        key = (self.model, self.compute_type)
+        if key not in self._models:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise Exception("Local transcription requires the faster-whisper package")
+            self._models[key] = WhisperModel(self.model, device='cpu', compute_type=self.compute_type)
+        return self._models[key]
+
+    def transcribe(self, request):
+        _, audio_bytes = request['file']
+        segments, info = self._get_model().transcribe(
+            io.BytesIO(audio_bytes),
+            language=request.get('language') or None
+        )
+        segments = [
+            {'id': i, 'start': segment.start, 'end': segment.end, 'text': segment.text}
+            for i, segment in enumerate(segments)
+        ]
+        return {
+            'text': ''.join(segment['text'] for segment in segments).strip(),
+            'language': info.language,
+            'duration': info.duration,
+            'segments': segments,
+        }
+
+    def transcribe_batch(self, requests):
+        results = []
+        for request in requests:
+            try:
+                results.append(self.transcribe(request))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def create_backend(name=None, api_key=None, base_url=None, model=None):
+    """Create the backend selected by arguments or TRANSCRIPTION_* settings."""
+    name = name or os.getenv('TRANSCRIPTION_BACKEND') or 'openai'
+    base_url = base_url or os.getenv('TRANSCRIPTION_BASE_URL') or None
+    model = model or os.getenv('TRANSCRIPTION_MODEL') or None
+
+    if name == 'openai':
+        return OpenAIBackend(api_key=api_key, base_url=base_url, model=model or 'whisper-1')
+    if name == 'local':
+        return LocalWhisperBackend(model=model or 'small')
+    raise ValueError(f"Unknown transcription backend: {name}")
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class TranscriptionCache:
+    """Content-addressed store of transcription API results.
+
+    Entries are keyed by a hash of the audio bytes and the request options,
+    so identical audio is never sent to the API twice. The cache is bounded
+    by total size and evicts the least recently used entries first.
+    """
+
+    def __init__(self, cache_dir='data/cache/transcriptions', max_bytes=512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Totals are scanned once, then tracked as entries are written and evicted
+        self._total_bytes = None
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(audio_bytes, model, language, response_format):
+        """Hash the audio content together with the request options."""
+        digest = hashlib.sha256()
+        digest.update(audio_bytes)
+        digest.update(f"|{model}|{language}|{response_format}".encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached result for a key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store a result and evict old entries if the cache is over budget."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            self._load_totals()
+            # Rewriting an existing key replaces its size instead of adding to it
+            try:
+                old_size = path.stat().st_size
+            except OSError:
+                old_size = None
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - (old_size or 0)
+            if old_size is None:
+                self._entries += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _load_totals(self):
+        """Scan the cache once for its size and entry count; call with the lock held."""
+        if self._total_bytes is None:
+            entries = self._scan()
+            self._total_bytes = sum(size for _, size, _ in entries)
+            self._entries = len(entries)
+
+    def _scan(self):
+        """List (path, size, mtime) of every cache entry."""
+        entries = []
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until under 90% of the budget."""
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                count -= 1
+            except OSError:
+                continue
+        self._total_bytes = total
+        self._entries = count
+
+    def get_stats(self):
+        """Get hit-rate and size statistics for the cache, without scanning it."""
+        with self._lock:
+            self._load_totals()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': self._entries,
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
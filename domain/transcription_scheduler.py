@@ -0,0 +1,266 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from domain.job_queue import get_job_runner, get_job_store
+from utils.ffmpeg import probe_audio
+from utils.atomic_io import file_lock, write_json
+
+POLICIES = {
+    'shortest_first': 'Shortest First',
+    'priority': 'Priority',
+}
+
+
+class TranscriptionScheduler:
+    """Background queue that transcribes many videos without supervision.
+
+    The queue and its scheduling policy are persisted to
+    data/transcription_queue.json, so pending work survives restarts; videos that were running when the process stopped
+    are queued again and resume from their chunk checkpoints. The scheduler
+    only decides the order: each video runs as a transcribe job in the
+    shared job store, so the transcribe worker pool and the process-wide
+    adaptive limiter bound the real concurrency.
+    """
+
+    POLL_INTERVAL = 2
+
+    def __init__(self, data_dir='data', policy='shortest_first', max_videos=2):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.final_result_dir = self.data_dir / 'final_result'
+        self.queue_file = self.data_dir / 'transcription_queue.json'
+        self.default_policy = policy
+        self.max_videos = max_videos
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # Work that was interrupted mid-run goes back to the queue
+        with self._locked():
+            entries = self._load_queue()
+            for entry in entries:
+                if entry['status'] == 'running':
+                    entry['status'] = 'queued'
+            self._save_queue(entries)
+
+    def _load_state(self):
+        """Load the queue state ({'policy', 'entries'}) from the JSON file."""
+        try:
+            with open(self.queue_file, 'r') as f:
+                state = json.load(f)
+        except Exception:
+            state = {}
+        if isinstance(state, list):
+            # Queues saved before the policy was persisted are a bare list
+            state = {'entries': state}
+        state.setdefault('policy', self.default_policy)
+        state.setdefault('entries', [])
+        return state
+
+    def _load_queue(self):
+        """Load queue entries from JSON file."""
+        return self._load_state()['entries']
+
+    def _save_queue(self, entries):
+        """Save queue entries to JSON file, keeping the saved policy."""
+        state = self._load_state()
+        state['entries'] = entries
+        write_json(self.queue_file, state)
+
+    def get_policy(self):
+        with self._locked():
+            return self._load_state()['policy']
+
+    def set_policy(self, policy):
+        """Change the scheduling policy for everyone using this queue."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        with self._locked():
+            state = self._load_state()
+            state['policy'] = policy
+            write_json(self.queue_file, state)
+
+    @contextmanager
+    def _locked(self):
+        """Guard a queue read-modify-write against other threads and processes."""
+        with self._lock, file_lock(self.queue_file):
+            yield
+
+    def _update_entry(self, video_id, **fields):
+        with self._locked():
+            entries = self._load_queue()
+            for entry in entries:
+                if entry['video_id'] == video_id:
+                    entry.update(fields)
+            self._save_queue(entries)
+
+    def get_source_path(self, video_id):
+        """Get the downloaded audio file of a video."""
+        return self.final_result_dir / video_id / 'original' / f"{video_id}.mp3"
+
+    def enqueue(self, video_ids, priority=0):
+        """Add videos to the queue; returns the number newly queued.
+
+        Videos already running are left alone and queued ones only take the
+        new priority; failed ones are queued again.
+        """
+        added = 0
+        with self._locked():
+            entries = self._load_queue()
+            by_id = {entry['video_id']: entry for entry in entries}
+            for video_id in video_ids:
+                existing = by_id.get(video_id)
+                if existing and existing['status'] == 'queued':
+                    existing['priority'] = priority
+                    continue
+                if existing and existing['status'] == 'running':
+                    continue
+
+                source_path = self.get_source_path(video_id)
+                if not source_path.exists():
+                    print(f"[WARNING] Not queueing {video_id}: audio not downloaded")
+                    continue
+                try:
+                    duration = probe_audio(source_path)['duration']
+                except Exception as e:
+                    print(f"[WARNING] Could not probe {video_id}: {e}")
+                    duration = None
+
+                entry = {
+                    'video_id': video_id,
+                    'source_path': str(source_path),
+                    'duration': duration,
+                    'priority': priority,
+                    'status': 'queued',
+                    'error': None,
+                    'enqueued_at': datetime.now().isoformat(),
+                    'started_at': None,
+                    'finished_at': None
+                }
+                if existing:
+                    existing.update(entry)
+                else:
+                    entries.append(entry)
+                    by_id[video_id] = entry
+                added += 1
+            self._save_queue(entries)
+        return added
+
+    @staticmethod
+    def _order(entries, policy):
+        """Order queued entries by the scheduling policy."""
+        if policy == 'priority':
+            return sorted(entries, key=lambda e: (-e['priority'], e['enqueued_at']))
+        # Shortest first finishes the most videos per hour; unknown durations go last
+        return sorted(entries, key=lambda e: (
+            e['duration'] is None,
+            e['duration'] or 0,
+            e['enqueued_at']
+        ))
+
+    def _claim_next(self):
+        """Mark the next queued video as running and return its entry."""
+        with self._locked():
+            state = self._load_state()
+            entries = state['entries']
+            queued = self._order([e for e in entries if e['status'] == 'queued'], state['policy'])
+            if not queued:
+                return None
+            claimed = queued[0]
+            claimed['status'] = 'running'
+            claimed['started_at'] = datetime.now().isoformat()
+            self._save_queue(entries)
+            return claimed
+
+    def _run_one(self, entry):
+        """Hand a video to the job runner's transcribe pool and wait for the outcome."""
+        video_id = entry['video_id']
+        try:
+            get_job_runner(self.data_dir)
+            store = get_job_store(self.data_dir / 'jobs.db')
+            job_id = store.submit('transcribe', video_id, priority=entry['priority'])
+            while True:
+                job = store.get_job(job_id)
+                if job['status'] not in ('queued', 'running'):
+                    break
+                time.sleep(self.POLL_INTERVAL)
+            status, error = job['status'], job['error']
+        except Exception as e:
+            status, error = 'failed', str(e)
+        print(f"[DEBUG] Scheduler finished {video_id}: {status}")
+        self._update_entry(video_id, status=status, error=error, finished_at=datetime.now().isoformat())
+
+    def _worker(self):
+        """Drain the queue with up to max_videos transcriptions at a time."""
+        with ThreadPoolExecutor(max_workers=self.max_videos) as executor:
+            running = set()
+            while True:
+                running = {future for future in running if not future.done()}
+                while len(running) < self.max_videos:
+                    entry = self._claim_next()
+                    if entry is None:
+                        break
+                    running.add(executor.submit(self._run_one, entry))
+                if not running:
+                    # Exit only if nothing was queued since the last claim
+                    with self._locked():
+                        if not any(e['status'] == 'queued' for e in self._load_queue()):
+                            self._thread = None
+                            return
+                    continue
+                time.sleep(1)
+
+    def start(self):
+        """Start draining the queue in the background if not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._worker, name='transcription-scheduler', daemon=True)
+            self._thread.start()
+            return True
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_status(self):
+        """Count queue entries by status."""
+        with self._locked():
+            entries = self._load_queue()
+        counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0, 'skipped': 0}
+        for entry in entries:
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+    def get_entries(self, status=None):
+        """Get queue entries, optionally filtered by status, in policy order."""
+        with self._locked():
+            state = self._load_state()
+        entries = state['entries']
+        if status:
+            entries = [e for e in entries if e['status'] == status]
+        return self._order(entries, state['policy']) if status == 'queued' else entries
+
+
+# One scheduler per data directory, shared by every session in the process
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(data_dir='data'):
+    """Get the process-wide scheduler for a data directory.
+
+    The scheduler holds no API key: the transcribe jobs it submits read the
+    configured key when they run.
+    """
+    key = str(Path(data_dir).resolve())
+    with _schedulers_lock:
+        if key not in _schedulers:
+            scheduler = TranscriptionScheduler(data_dir=data_dir)
+            _schedulers[key] = scheduler
+            # Pick up work left in the persisted queue by a previous process
+            if scheduler.get_status()['queued']:
+                scheduler.start()
+        return _schedulers[key]
@@ -1,117 +1,487 @@
 import os
+import json
+import shutil
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
-from openai import OpenAI
-from pydub import AudioSegment
 import math
+from difflib import SequenceMatcher
+from utils.audio_analysis import find_quietest_point
+from utils.ffmpeg import probe_audio, render_segment, transcode
+from utils.atomic_io import write_json
+from domain.transcription_cache import TranscriptionCache
+from domain.transcription_backends import create_backend
+from domain.transcription_store import TranscriptionStore
+
+# One result cache per cache directory, kept across Streamlit reruns so
+# hit-rate stats accumulate for the life of the process
+_result_caches = {}
+
+
+def get_result_cache(cache_dir):
+    """Get the shared transcription result cache for a directory."""
+    key = str(cache_dir)
+    if key not in _result_caches:
+        _result_caches[key] = TranscriptionCache(cache_dir)
+    return _result_caches[key]
+
+
+# Whisper verbose JSON reports languages by name; map the common ones to
+# the ISO 639-1 codes used for requests and the allowlist
+LANGUAGE_CODES = {
+    'indonesian': 'id',
+    'malay': 'ms',
+    'javanese': 'jw',
+    'sundanese': 'su',
+    'english': 'en',
+    'chinese': 'zh',
+    'japanese': 'ja',
+    'korean': 'ko',
+    'thai': 'th',
+    'vietnamese': 'vi',
+    'tagalog': 'tl',
+    'hindi': 'hi',
+    'arabic': 'ar',
+    'spanish': 'es',
+    'portuguese': 'pt',
+    'french': 'fr',
+    'german': 'de',
+    'russian': 'ru',
+}
+
+# Languages Whisper often confuses, so a probe reporting one of them does
+# not skip a video wanted in the other (e.g. Indonesian labelled as Malay)
+COMPATIBLE_LANGUAGES = {
+    'id': ('ms',),
+    'ms': ('id',),
+}
+
+
+def get_allowed_languages(default='id'):
+    """Get the languages worth a full transcription (TRANSCRIPTION_LANGUAGES)."""
+    allowed = os.getenv('TRANSCRIPTION_LANGUAGES') or default
+    return [code.strip().lower() for code in allowed.split(',') if code.strip()]
+
+
+def merge_overlapping_segments(previous, incoming, cut_seconds, overlap_seconds, similarity=0.6):
+    """Join the segments of two adjacent, overlapping chunks at their cut point.
+    
+    Each chunk keeps the segments that start on its own side of the cut.
+    A segment transcribed by both chunks that straddles the cut is detected
+    by timestamps overlapping within the chunks' shared audio and similar
+    text, and kept only once.
+    """
+    merged = [segment for segment in previous if segment['start'] < cut_seconds]
+    following = [segment for segment in incoming if segment['start'] >= cut_seconds]
+    
+    if merged and following:
+        last, first = merged[-1], following[0]
+        overlaps = first['start'] < min(last['end'], cut_seconds + overlap_seconds)
+        ratio = SequenceMatcher(None, last['text'].strip().lower(), first['text'].strip().lower()).ratio()
+        if overlaps and ratio >= similarity:
+            merged[-1] = {
+                'start': last['start'],
+                'end': max(last['end'], first['end']),
+                'text': max(last['text'], first['text'], key=lambda text: len(text.strip()))
+            }
+            following = following[1:]
+    
+    return merged + following
+
 
 class TranscriptionService:
-    def __init__(self, data_dir='data', api_key=None):
-        """Initialize the transcription service."""
+    def __init__(self, data_dir='data', api_key=None, backend=None):
+        """Initialize the transcription service.
+        
+        Args:
+            data_dir: Root data directory
+            api_key: OpenAI API key, used when no backend is given
+            backend: TranscriptionBackend to use, created from the
+                TRANSCRIPTION_* environment settings if not given
+        """
         self.data_dir = Path(data_dir)
         self.final_result_dir = self.data_dir / 'final_result'
         self.chunks_dir = self.data_dir / 'chunks'
         self.final_result_dir.mkdir(parents=True, exist_ok=True)
         self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.store = TranscriptionStore(self.final_result_dir)
         
-        # Initialize OpenAI client with provided API key
-        self.client = OpenAI(api_key=api_key)
+        # Transcription engine (OpenAI by default)
+        self.backend = backend or create_backend(api_key=api_key)
         
         # Maximum file size for Whisper API (25MB)
         self.MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB in bytes
+        
+        # Transcription profile: Whisper works on 16kHz mono, so a low-bitrate
+        # speech Opus derivative loses nothing and is ~5x smaller than the source
+        self.TRANSCRIPTION_AUDIO_PARAMETERS = [
+            "-ac", "1",
+            "-ar", "16000",
+            "-c:a", "libopus",
+            "-b:a", "24k",
+            "-application", "voip"
+        ]
+        
+        # Encoded size budget per chunk, leaving headroom under MAX_FILE_SIZE
+        self.CHUNK_TARGET_SIZE = 20 * 1024 * 1024
+        # Conservative estimate of the chunk bitrate (24k Opus plus container overhead)
+        self.CHUNK_BITRATE = 32 * 1000  # bits per second
+        
+        # Chunk cuts are moved to the quietest point within this distance of
+        # the nominal cut, and chunks optionally overlap by CHUNK_OVERLAP_MS
+        self.BOUNDARY_SEARCH_MS = 10 * 1000
+        self.CHUNK_OVERLAP_MS = 0
+        
+        # Chunks submitted to the backend as one batch
+        self.BATCH_SIZE = 8
+        
+        # Transcription request options, also part of the result cache key
+        self.MODEL = self.backend.model
+        self.LANGUAGE = "id"
+        
+        # Languages worth a full transcription; other videos are skipped after
+        # a short language probe on LANGUAGE_SAMPLE_MS of audio from the middle
+        # (a forced re-probe moves on to the next sample position)
+        self.ALLOWED_LANGUAGES = get_allowed_languages(self.LANGUAGE)
+        self.LANGUAGE_SAMPLE_MS = 30 * 1000
+        self.LANGUAGE_SAMPLE_POSITIONS = (0.5, 0.25, 0.75)
+        self.RESPONSE_FORMAT = "verbose_json"
+        self.result_cache = get_result_cache(self.data_dir / 'cache' / 'transcriptions')
     
-    def get_excel_path(self, video_id):
-        """Get the CSV file path for a specific video."""
-        video_dir = self.final_result_dir / video_id
-        video_dir.mkdir(parents=True, exist_ok=True)
-        return video_dir / f"{video_id}_transcription.csv"
+    def get_transcription_path(self, video_id):
+        """Get the transcription file path for a specific video."""
+        return self.store.get_path(video_id)
     
     def get_chunk_dir(self, video_id):
-        """Get the directory for storing audio chunks."""
+        """Get the directory for storing the chunk plan and checkpoints."""
         chunk_dir = self.chunks_dir / video_id
         chunk_dir.mkdir(parents=True, exist_ok=True)
         return chunk_dir
     
-    def split_audio_file(self, source_path, video_id):
-        """Split large audio files into chunks for transcription."""
+    def get_transcription_audio_path(self, video_id):
+        """Get the path of the 16kHz mono derivative used for transcription."""
+        return self.final_result_dir / video_id / 'original' / f"{video_id}_16k.ogg"
+    
+    def prepare_transcription_audio(self, source_path, video_id):
+        """Create the transcription derivative, reusing it while it is up to date."""
+        derivative_path = self.get_transcription_audio_path(video_id)
+        if derivative_path.exists() and derivative_path.stat().st_mtime >= os.path.getmtime(source_path):
+            return str(derivative_path)
+        
+        print(f"[DEBUG] Creating transcription audio {derivative_path}")
+        derivative_path.parent.mkdir(parents=True, exist_ok=True)
+        return transcode(source_path, derivative_path, self.TRANSCRIPTION_AUDIO_PARAMETERS)
+    
+    def get_language_path(self, video_id):
+        """Get the path of the cached language probe result for a video."""
+        return self.final_result_dir / video_id / f"{video_id}_language.json"
+    
+    def resolve_language(self, language):
+        """Get the allowed language to transcribe a detected one in, or None to skip it."""
+        if language in self.ALLOWED_LANGUAGES:
+            return language
+        for allowed in self.ALLOWED_LANGUAGES:
+            if language in COMPATIBLE_LANGUAGES.get(allowed, ()):
+                return allowed
+        return None
+    
+    def detect_language(self, audio_path, video_id, force=False):
+        """Detect the spoken language from a short sample, cached per video.
+        
+        Falls back to the default LANGUAGE if the probe fails.
+        
+        Args:
+            audio_path: Audio to sample
+            video_id: Video the cached result belongs to
+            force: Probe again instead of using the cached result; every forced
+                probe samples a different part of the audio
+        """
+        language_path = self.get_language_path(video_id)
+        cached = {}
+        if language_path.exists():
+            try:
+                with open(language_path, 'r') as f:
+                    cached = json.load(f)
+                if not force:
+                    return cached['language']
+            except (OSError, ValueError, KeyError):
+                cached = {}
+        probes = cached.get('probes', 1 if cached else 0)
+        
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(source_path)
-            
-            # Get file size
-            file_size = os.path.getsize(source_path)
+            duration_ms = int(probe_audio(audio_path)['duration'] * 1000)
+            position = self.LANGUAGE_SAMPLE_POSITIONS[probes % len(self.LANGUAGE_SAMPLE_POSITIONS)]
+            sample_start_ms = max(0, int(duration_ms * position) - self.LANGUAGE_SAMPLE_MS // 2)
+            sample = render_segment(
+                audio_path,
+                sample_start_ms / 1000,
+                self.LANGUAGE_SAMPLE_MS / 1000,
+                output_format='ogg',
+                parameters=self.TRANSCRIPTION_AUDIO_PARAMETERS
+            )
+            request = {
+                'file': (f"{video_id}_language_sample.ogg", sample),
+                'language': None,
+                'response_format': self.RESPONSE_FORMAT
+            }
+            outcome = self.backend.transcribe_batch([request])[0]
+            if isinstance(outcome, Exception):
+                raise outcome
+        except Exception as e:
+            print(f"[WARNING] Language probe failed for {video_id}, assuming '{self.LANGUAGE}': {str(e)}")
+            return self.LANGUAGE
+        
+        detected = str(outcome.get('language') or '').strip().lower()
+        language = LANGUAGE_CODES.get(detected, detected) or self.LANGUAGE
+        print(f"[DEBUG] Detected language for {video_id}: {language} ({detected})")
+        
+        write_json(language_path, {
+            'language': language,
+            'detected': detected,
+            'sample_start_ms': sample_start_ms,
+            'probes': probes + 1,
+            'timestamp': datetime.now().isoformat()
+        })
+        return language
+    
+    def get_plan_path(self, video_id):
+        """Get the path of the saved chunk plan for a video."""
+        return self.get_chunk_dir(video_id) / 'plan.json'
+    
+    def get_checkpoint_path(self, video_id, index):
+        """Get the path of the checkpoint for a finished chunk."""
+        return self.get_chunk_dir(video_id) / f"chunk_{index:03d}.json"
+    
+    def plan_chunks(self, source_path, video_id):
+        """Plan chunk boundaries, reusing the saved plan if the source is unchanged."""
+        stat = os.stat(source_path)
+        source = {
+            'source_path': str(source_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime
+        }
+        
+        plan_path = self.get_plan_path(video_id)
+        if plan_path.exists():
+            try:
+                with open(plan_path, 'r') as f:
+                    saved_plan = json.load(f)
+                if saved_plan['source'] == source:
+                    return saved_plan
+            except (OSError, ValueError, KeyError):
+                pass
+            # The source changed, so old checkpoints no longer line up
+            self.clear_checkpoints(video_id)
+        
+        # Read duration and size from the container instead of decoding
+        info = probe_audio(source_path)
+        duration_ms = int(info['duration'] * 1000)
+        
+        # If file is small enough, send it as a single chunk
+        if info['size'] < self.MAX_FILE_SIZE:
+            plan = {'source': source, 'whole_file': True, 'chunks': [[0, duration_ms]]}
+        else:
+            # Size chunks by their encoded output size, not the source file size
+            encoded_size = info['duration'] * self.CHUNK_BITRATE / 8
+            num_chunks = max(1, math.ceil(encoded_size / self.CHUNK_TARGET_SIZE))
+            chunk_duration = duration_ms / num_chunks
             
-            # If file is small enough, return it as a single chunk
-            if file_size < self.MAX_FILE_SIZE:
-                return [(source_path, 0, len(audio))]
+            # Move each cut to a pause so words are not split across chunks
+            cuts = [0]
+            for i in range(1, num_chunks):
+                cuts.append(find_quietest_point(source_path, int(i * chunk_duration), self.BOUNDARY_SEARCH_MS))
+            cuts.append(duration_ms)
             
-            # Calculate number of chunks needed
-            num_chunks = math.ceil(file_size / self.MAX_FILE_SIZE)
-            chunk_duration = len(audio) / num_chunks
+            plan = {
+                'source': source,
+                'whole_file': False,
+                'cuts': cuts,
+                'chunks': [
+                    [max(0, cuts[i] - self.CHUNK_OVERLAP_MS), min(duration_ms, cuts[i + 1] + self.CHUNK_OVERLAP_MS)]
+                    for i in range(num_chunks)
+                ]
+            }
+        
+        # clear_checkpoints removed the directory along with the old plan
+        plan_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(plan_path, plan)
+        return plan
+    
+    def split_audio_file(self, source_path, video_id, plan=None, indexes=None):
+        """Split large audio files into chunks for transcription.
+        
+        Chunks are only described here as (filename, start_ms, end_ms); their
+        audio is encoded in memory by encode_chunk when the chunk is sent, so
+        nothing is written to disk and memory is bounded by chunks in flight.
+        
+        Args:
+            source_path: Path to the source audio file
+            video_id: Video ID for organizing chunks
+            plan: Chunk plan from plan_chunks, created if not given
+            indexes: Chunk indexes to return, all chunks if not given
+        """
+        try:
+            if plan is None:
+                plan = self.plan_chunks(source_path, video_id)
+            if indexes is None:
+                indexes = range(len(plan['chunks']))
             
             chunks = []
-            chunk_dir = self.get_chunk_dir(video_id)
-            
-            # Clear existing chunks
-            for existing_file in chunk_dir.glob('*.ogg'):
-                os.remove(existing_file)
-            
-            # Split audio into chunks
-            for i in range(num_chunks):
-                start_ms = int(i * chunk_duration)
-                end_ms = int(min((i + 1) * chunk_duration, len(audio)))
-                
-                chunk = audio[start_ms:end_ms]
-                chunk_path = chunk_dir / f"chunk_{i:03d}.ogg"
-                
-                # Export chunk with lower bitrate to ensure it's under 25MB
-                chunk.export(
-                    chunk_path,
-                    format="ogg",
-                    parameters=["-q:a", "3"]  # Lower quality to reduce file size
-                )
-                
-                chunks.append((str(chunk_path), start_ms, end_ms))
-            
+            for i in indexes:
+                start_ms, end_ms = plan['chunks'][i]
+                if plan['whole_file']:
+                    filename = Path(source_path).name
+                else:
+                    filename = f"{video_id}_chunk_{i:03d}.ogg"
+                chunks.append((filename, start_ms, end_ms))
             return chunks
             
         except Exception as e:
             raise Exception(f"Error splitting audio: {str(e)}")
     
-    def transcribe_audio(self, source_path, video_id):
-        """Transcribe audio file and save transcription data."""
+    def encode_chunk(self, source_path, plan, start_ms, end_ms):
+        """Get the audio bytes to upload for a chunk."""
+        if plan['whole_file']:
+            with open(source_path, 'rb') as audio_file:
+                return audio_file.read()
+        
+        # Encode straight from an ffmpeg pipe with the transcription profile
+        return render_segment(
+            source_path,
+            start_ms / 1000,
+            (end_ms - start_ms) / 1000,
+            output_format='ogg',
+            parameters=self.TRANSCRIPTION_AUDIO_PARAMETERS
+        )
+    
+    def _load_checkpoints(self, video_id, plan):
+        """Load results of chunks finished in earlier attempts."""
+        results = {}
+        for index, (start_ms, end_ms) in enumerate(plan['chunks']):
+            checkpoint_path = self.get_checkpoint_path(video_id, index)
+            if not checkpoint_path.exists():
+                continue
+            try:
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+                if checkpoint['start_ms'] == start_ms and checkpoint['end_ms'] == end_ms:
+                    results[index] = checkpoint['result']
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[WARNING] Ignoring unreadable checkpoint {checkpoint_path}: {e}")
+        return results
+    
+    def _save_checkpoint(self, video_id, index, start_ms, end_ms, result):
+        """Save a finished chunk's result so a retry can skip it."""
+        checkpoint_path = self.get_checkpoint_path(video_id, index)
+        write_json(checkpoint_path, {
+            'index': index,
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'result': result
+        }, ensure_ascii=False, indent=None)
+    
+    def clear_checkpoints(self, video_id):
+        """Remove the chunk plan and checkpoints of a video."""
+        shutil.rmtree(self.chunks_dir / video_id, ignore_errors=True)
+    
+    def transcribe_audio(self, source_path, video_id, language=None, redetect=False, progress_callback=None):
+        """Transcribe audio file and save transcription data.
+        
+        Finished chunks are checkpointed under data/chunks/<video_id>, so a
+        failed run can be retried and only the missing chunks are sent again.
+        
+        Args:
+            source_path: Downloaded audio of the video
+            video_id: Video to transcribe
+            language: Transcribe in this language without probing or filtering
+            redetect: Probe the language again instead of using the cached result
+            progress_callback: Called with the fraction of chunks done (0 to 1)
+        
+        Returns:
+            (True, transcription_data) on success, (False, error) on failure, or
+            (False, {'skipped': True, 'language': ..., 'error': ...}) when the
+            detected language is not wanted
+        """
         try:
             print(f"[DEBUG] Starting transcription for video {video_id}")
+            # Plan and upload from the compact derivative, not the original
+            audio_path = self.prepare_transcription_audio(source_path, video_id)
+            
+            # Route by spoken language before paying for the full transcription
+            if not language:
+                detected = self.detect_language(audio_path, video_id, force=redetect)
+                language = self.resolve_language(detected)
+                if language is None:
+                    print(f"[DEBUG] Skipping {video_id}: detected language '{detected}'")
+                    return False, {
+                        'skipped': True,
+                        'language': detected,
+                        'error': (
+                            f"Detected language '{detected}' is not one of "
+                            f"{', '.join(self.ALLOWED_LANGUAGES)}"
+                        ),
+                    }
+            plan = self.plan_chunks(audio_path, video_id)
+            total = len(plan['chunks'])
+            
+            results = self._load_checkpoints(video_id, plan)
+            pending = [i for i in range(total) if i not in results]
+            if results:
+                print(f"[DEBUG] Resuming from checkpoints: {len(results)}/{total} chunks already done")
+            if progress_callback:
+                progress_callback(len(results) / total)
+            
             # Split audio into chunks if needed
-            chunks = self.split_audio_file(source_path, video_id)
-            print(f"[DEBUG] Split audio into {len(chunks)} chunks")
+            chunks = self.split_audio_file(audio_path, video_id, plan, pending)
+            print(f"[DEBUG] Prepared {len(chunks)} of {total} chunks")
+            
+            # Send chunks to the backend in batches; every chunk is checkpointed as it finishes
+            failures = []
+            pending_chunks = list(zip(pending, chunks))
+            for batch_start in range(0, len(pending_chunks), self.BATCH_SIZE):
+                batch = pending_chunks[batch_start:batch_start + self.BATCH_SIZE]
+                for index, outcome in self._transcribe_batch(audio_path, plan, batch, total, video_id, language):
+                    if isinstance(outcome, Exception):
+                        print(f"[ERROR] Chunk {index+1}/{total} failed: {str(outcome)}")
+                        failures.append(str(outcome))
+                    else:
+                        results[index] = outcome
+                        if progress_callback:
+                            progress_callback(len(results) / total)
+            
+            if failures:
+                return False, (
+                    f"{len(failures)} of {total} chunks failed ({failures[0]}). "
+                    f"Finished chunks were saved and will be reused on retry."
+                )
             
             all_segments = []
-            full_text = []
-            
-            # Process each chunk
-            for i, (chunk_path, start_ms, end_ms) in enumerate(chunks):
-                print(f"[DEBUG] Processing chunk {i+1}/{len(chunks)}")
-                with open(chunk_path, 'rb') as audio_file:
-                    # Call OpenAI's transcription API
-                    transcript = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="id",
-                        response_format="verbose_json"
-                    )
-                
+            
+            for index, (start_ms, end_ms) in enumerate(plan['chunks']):
+                transcript = results[index]
                 # Adjust timestamps for this chunk
-                for segment in transcript.segments:
-                    adjusted_segment = {
-                        'start': segment.start + (start_ms / 1000),  # Convert ms to seconds
-                        'end': segment.end + (start_ms / 1000),
-                        'text': segment.text
+                chunk_segments = [
+                    {
+                        'start': segment['start'] + (start_ms / 1000),  # Convert ms to seconds
+                        'end': segment['end'] + (start_ms / 1000),
+                        'text': segment['text']
                     }
-                    all_segments.append(adjusted_segment)
-                
-                full_text.append(transcript.text)
+                    for segment in transcript['segments']
+                ]
+                # Audio shared with the previous chunk, as planned when the chunks were cut
+                overlap_ms = plan['chunks'][index - 1][1] - start_ms if index else 0
+                if overlap_ms > 0:
+                    all_segments = merge_overlapping_segments(
+                        all_segments, chunk_segments, plan['cuts'][index] / 1000, overlap_ms / 1000
+                    )
+                else:
+                    # Chunks without overlap can't repeat each other's speech
+                    all_segments.extend(chunk_segments)
+            
+            if plan['whole_file']:
+                full_text = [results[0]['text']]
+            else:
+                full_text = [segment['text'].strip() for segment in all_segments]
             
             print(f"[DEBUG] Transcription completed. Creating transcription data")
             # Combine all transcriptions
@@ -120,25 +490,20 @@ class TranscriptionService:
                 'source_path': source_path,
                 'full_text': ' '.join(full_text),
                 'segments': all_segments,
-                'language': 'id',
+                'language': language,
                 'timestamp': datetime.now().isoformat()
             }
             
-            print(f"[DEBUG] Saving transcription data to CSV")
+            print(f"[DEBUG] Saving transcription data")
             try:
-                # Save to CSV
-                self._save_to_csv(transcription_data)
-                print(f"[DEBUG] CSV file saved successfully at {self.get_excel_path(video_id)}")
-            except Exception as csv_error:
-                print(f"[ERROR] Failed to save CSV file: {str(csv_error)}")
-                return False, f"Transcription successful but failed to save CSV: {str(csv_error)}"
-            
-            # Clean up chunks if they were created
-            if len(chunks) > 1:
-                chunk_dir = self.get_chunk_dir(video_id)
-                for chunk_file in chunk_dir.glob('*.ogg'):
-                    os.remove(chunk_file)
-                os.rmdir(chunk_dir)
+                self._save_transcription(transcription_data)
+                print(f"[DEBUG] Transcription saved successfully at {self.get_transcription_path(video_id)}")
+            except Exception as save_error:
+                print(f"[ERROR] Failed to save transcription: {str(save_error)}")
+                return False, f"Transcription successful but failed to save it: {str(save_error)}"
+            
+            # Clean up chunks and checkpoints once the transcription is written
+            self.clear_checkpoints(video_id)
             
             return True, transcription_data
             
@@ -146,12 +511,48 @@ class TranscriptionService:
             print(f"[ERROR] Transcription failed: {str(e)}")
             return False, str(e)
     
-    def _save_to_csv(self, transcription_data):
-        """Save transcription data to CSV file."""
+    def _transcribe_batch(self, source_path, plan, batch, total, video_id, language):
+        """Transcribe a batch of (index, chunk) pairs, reusing cached results.
+        
+        Yields (index, result or exception) for every chunk in the batch.
+        """
+        requests = []
+        for index, (filename, start_ms, end_ms) in batch:
+            print(f"[DEBUG] Processing chunk {index+1}/{total}")
+            audio_bytes = self.encode_chunk(source_path, plan, start_ms, end_ms)
+            
+            cache_key = self.result_cache.make_key(
+                audio_bytes, self.MODEL, language, self.RESPONSE_FORMAT
+            )
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                print(f"[DEBUG] Using cached transcription for chunk {index+1}/{total}")
+                self._save_checkpoint(video_id, index, start_ms, end_ms, cached)
+                yield index, cached
+                continue
+            
+            requests.append(((index, start_ms, end_ms, cache_key), {
+                'file': (filename, audio_bytes),
+                'language': language,
+                'response_format': self.RESPONSE_FORMAT
+            }))
+        
+        outcomes = self.backend.transcribe_batch([request for _, request in requests])
+        for ((index, start_ms, end_ms, cache_key), _), outcome in zip(requests, outcomes):
+            if not isinstance(outcome, Exception):
+                self.result_cache.put(cache_key, outcome)
+                self._save_checkpoint(video_id, index, start_ms, end_ms, outcome)
+            yield index, outcome
+    
+    def get_cache_stats(self):
+        """Get hit-rate and size statistics for the transcription result cache."""
+        return self.result_cache.get_stats()
+    
+    def _save_transcription(self, transcription_data):
+        """Save transcription segments to the transcription store."""
         try:
             video_id = transcription_data['video_id']
-            csv_path = self.get_excel_path(video_id)
-            print(f"[DEBUG] Preparing CSV data for {video_id}")
+            print(f"[DEBUG] Preparing transcription data for {video_id}")
             
             # Convert source path to relative path
             source_path = Path(transcription_data['source_path'])
@@ -176,61 +577,25 @@ class TranscriptionService:
                     'timestamp': transcription_data['timestamp']
                 })
             
-            print(f"[DEBUG] Creating DataFrame with {len(segments_data)} segments")
-            # Create DataFrame with segments
-            segments_df = pd.DataFrame(segments_data)
-            
-            print(f"[DEBUG] Writing CSV file to {csv_path}")
-            # Write segments to single sheet
-            segments_df.to_csv(csv_path, index=False)
-            print(f"[DEBUG] CSV file written successfully")
+            print(f"[DEBUG] Writing {len(segments_data)} segments")
+            with self.store.lock(video_id):
+                self.store.write(video_id, pd.DataFrame(segments_data))
             
         except Exception as e:
-            print(f"[ERROR] Error in _save_to_csv: {str(e)}")
-            raise Exception(f"Failed to save CSV file: {str(e)}")
+            print(f"[ERROR] Error in _save_transcription: {str(e)}")
+            raise Exception(f"Failed to save transcription: {str(e)}")
     
     def get_transcription(self, video_id):
         """Get transcription data for a specific video."""
-        csv_path = self.get_excel_path(video_id)
-        
-        if not os.path.exists(csv_path):
-            return None
-        
         try:
-            # Try reading from new format first
-            try:
-                segments_df = pd.read_csv(csv_path)
-                return segments_df.to_dict('records')
-            except ValueError:  # Sheet not found, try old format
-                # Read from old format
-                segments_df = pd.read_csv(csv_path)
-                metadata_df = pd.read_csv(csv_path)
-                
-                # Convert to new format
-                segments_data = []
-                for _, segment in segments_df.iterrows():
-                    segments_data.append({
-                        'video_id': metadata_df['video_id'].iloc[0],
-                        'source_path': str(Path(metadata_df['source_path'].iloc[0]).relative_to(Path.cwd())),
-                        'start_time_seconds': segment['start_time'],
-                        'end_time_seconds': segment['end_time'],
-                        'duration_seconds': segment['end_time'] - segment['start_time'],
-                        'text': segment['text'],
-                        'language': segment['language'],
-                        'timestamp': metadata_df['timestamp'].iloc[0]
-                    })
-                
-                # Save in new format for future use
-                new_df = pd.DataFrame(segments_data)
-                new_df.to_csv(csv_path, index=False)
-                
-                return segments_data
-                
+            segments_df = self.store.read(video_id)
+            if segments_df is None:
+                return None
+            return segments_df.to_dict('records')
         except Exception as e:
             print(f"Error reading transcription: {e}")
             return None
     
     def has_transcription(self, video_id):
         """Check if transcription exists for a video."""
-        csv_path = self.get_excel_path(video_id)
-        return os.path.exists(csv_path)
+        return self.store.exists(video_id)
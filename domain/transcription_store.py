@@ -0,0 +1,144 @@
+import os
+import threading
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from domain.search_index import get_search_index
+from utils.atomic_io import atomic_path, file_lock
+
+# Bump when the column layout changes and add an upgrade step in _upgrade
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_KEY = b'transcription_schema_version'
+
+TRANSCRIPTION_SCHEMA = pa.schema([
+    ('video_id', pa.string()),
+    ('source_path', pa.string()),
+    ('start_time_seconds', pa.float64()),
+    ('end_time_seconds', pa.float64()),
+    ('duration_seconds', pa.float64()),
+    ('text', pa.string()),
+    ('language', pa.string()),
+    ('timestamp', pa.string()),
+    ('audio_file', pa.string()),
+])
+
+# Parsed transcriptions keyed by path, reused while (mtime, size) is unchanged
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class TranscriptionStore:
+    """Typed Parquet storage for per-video transcription segments.
+
+    Reads go through a process-wide cache keyed on file mtime and size, so
+    repeated reads of an unchanged transcript cost a stat call. Legacy
+    `<id>_transcription.csv` files are migrated on first read, and a CSV
+    copy can still be exported on every write.
+    """
+
+    def __init__(self, final_result_dir='data/final_result', export_csv=None):
+        self.final_result_dir = Path(final_result_dir)
+        if export_csv is None:
+            export_csv = os.getenv('TRANSCRIPTION_EXPORT_CSV', '').lower() in ('1', 'true', 'yes')
+        self.export_csv = export_csv
+
+    def get_path(self, video_id):
+        """Get the Parquet transcription path for a video."""
+        return self.final_result_dir / video_id / f"{video_id}_transcription.parquet"
+
+    def get_csv_path(self, video_id):
+        """Get the legacy/exported CSV transcription path for a video."""
+        return self.final_result_dir / video_id / f"{video_id}_transcription.csv"
+
+    def exists(self, video_id):
+        """Check if a transcription exists in either format."""
+        return self.get_path(video_id).exists() or self.get_csv_path(video_id).exists()
+
+    def read(self, video_id):
+        """Read a transcription as a DataFrame, or None if there is none."""
+        path = self.get_path(video_id)
+        if not path.exists():
+            if not self.get_csv_path(video_id).exists():
+                return None
+            self.migrate(video_id)
+
+        stat = path.stat()
+        key = str(path)
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+                return cached[1].copy()
+
+        table = pq.read_table(path)
+        df = self._upgrade(table).to_pandas()
+        with _cache_lock:
+            _cache[key] = ((stat.st_mtime_ns, stat.st_size), df)
+        return df.copy()
+
+    def write(self, video_id, df):
+        """Write a transcription, coercing it to the current schema."""
+        path = self.get_path(video_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = self._to_table(df)
+
+        with atomic_path(path) as tmp_path:
+            pq.write_table(table, tmp_path)
+        with _cache_lock:
+            _cache.pop(str(path), None)
+
+        if self.export_csv:
+            with atomic_path(self.get_csv_path(video_id)) as tmp_path:
+                table.to_pandas().to_csv(tmp_path, index=False)
+        
+        # Keep the full-text index in step with every transcription write
+        try:
+            self.get_search_index().update_video(video_id, table.to_pandas(), path.stat())
+        except Exception as e:
+            print(f"[WARNING] Could not update search index for {video_id}: {e}")
+        return path
+
+    def lock(self, video_id):
+        """Lock a video's transcription for a read-modify-write, across processes."""
+        return file_lock(self.get_path(video_id))
+
+    def get_search_index(self):
+        """Get the full-text index stored next to the final_result directory."""
+        return get_search_index(self.final_result_dir.parent / 'search_index.db')
+
+    def migrate(self, video_id):
+        """Convert a legacy CSV transcription to Parquet."""
+        csv_path = self.get_csv_path(video_id)
+        print(f"[DEBUG] Migrating {csv_path} to Parquet")
+        df = pd.read_csv(csv_path)
+
+        # Oldest files used start_time/end_time columns
+        if 'start_time_seconds' not in df.columns and 'start_time' in df.columns:
+            df = df.rename(columns={'start_time': 'start_time_seconds', 'end_time': 'end_time_seconds'})
+        if 'duration_seconds' not in df.columns:
+            df['duration_seconds'] = df['end_time_seconds'] - df['start_time_seconds']
+
+        return self.write(video_id, df)
+
+    @staticmethod
+    def _to_table(df):
+        df = df.copy()
+        for field in TRANSCRIPTION_SCHEMA:
+            if field.name not in df.columns:
+                df[field.name] = None
+        df = df[[field.name for field in TRANSCRIPTION_SCHEMA]].copy()
+        for field in TRANSCRIPTION_SCHEMA:
+            if pa.types.is_string(field.type):
+                df[field.name] = df[field.name].map(lambda v: None if pd.isna(v) else str(v))
+        table = pa.Table.from_pandas(df, schema=TRANSCRIPTION_SCHEMA, preserve_index=False)
+        return table.replace_schema_metadata({SCHEMA_VERSION_KEY: str(SCHEMA_VERSION).encode()})
+
+    @staticmethod
+    def _upgrade(table):
+        """Bring a table written with an older schema version up to date."""
+        metadata = table.schema.metadata or {}
+        version = int(metadata.get(SCHEMA_VERSION_KEY, b'0'))
+        if version > SCHEMA_VERSION:
+            raise Exception(f"Transcription uses a newer schema version ({version})")
+        # No upgrade steps yet; add them here when SCHEMA_VERSION is bumped
+        return table
@@ -33,6 +33,10 @@ if 'videos_per_page' not in st.session_state:
     st.session_state.videos_per_page = 9
 if 'download_states' not in st.session_state:
     st.session_state.download_states = {}
+if 'persisted_video_ids' not in st.session_state:
+    st.session_state.persisted_video_ids = set()
+if 'catalog_total' not in st.session_state:
+    st.session_state.catalog_total = 0
 
 # Main app
 st.title('🎥 YouTube Video Search')
@@ -63,8 +67,15 @@ search_youtube_videos(youtube_service)
 # Display search results
 display_search_results(youtube_service)
 
-# Auto-save to Excel if there are search results
+# Auto-save new search results to the catalog; reruns with nothing new skip the write
 if st.session_state.all_videos:
-    excel_file = f"{st.session_state.data_dir}/youtube_videos.xlsx"
-    total_saved = data_service.save_videos_to_excel(st.session_state.all_videos, excel_file)
-    st.info(f'💾 {total_saved} videos saved to database')
+    new_videos = [
+        video for video in st.session_state.all_videos
+        if video['id'] not in st.session_state.persisted_video_ids
+    ]
+    if new_videos:
+        total_saved = data_service.save_videos(new_videos)
+        if total_saved:
+            st.session_state.catalog_total = total_saved
+            st.session_state.persisted_video_ids.update(video['id'] for video in new_videos)
+    st.info(f'💾 {st.session_state.catalog_total} videos saved to database')
@@ -1,18 +1,16 @@
 import streamlit as st
-import pandas as pd
 import os
 from domain.youtube_service import YouTubeService
 from domain.data_service import DataService
-from domain.audio_service import AudioService
 from domain.transcription_service import TranscriptionService
-from domain.audio_splitter import AudioSplitter
 from domain.config_service import ConfigService
+from domain.transcription_scheduler import get_scheduler, POLICIES
+from domain.artifact_index import get_artifact_index
 from ui.process_handlers import (
-    get_processing_state,
-    set_processing_state,
-    handle_split_audio,
-    handle_transcription,
-    handle_conversion
+    submit_job,
+    get_video_jobs,
+    is_job_active,
+    show_job_status
 )
 import math
 from pathlib import Path
@@ -35,9 +33,8 @@ if 'openai_api_key' not in st.session_state or not st.session_state.openai_api_k
 config_service = ConfigService()
 youtube_service = YouTubeService(os.getenv('YOUTUBE_API_KEY'))
 data_service = DataService()
-audio_service = AudioService()
 transcription_service = TranscriptionService(api_key=st.session_state.openai_api_key)
-audio_splitter = AudioSplitter()
+artifact_index = get_artifact_index()
 
 # Custom CSS
 st.markdown("""
@@ -97,76 +94,106 @@ st.markdown("---")
 # Add cleanup button in sidebar
 with st.sidebar:
     if st.button("🧹 Clean Database", help="Remove entries from database that don't have corresponding audio files"):
-        initial_count, final_count = data_service.clean_excel_data()
+        initial_count, final_count = data_service.clean_catalog()
         removed = initial_count - final_count
         if removed > 0:
             st.success(f"Removed {removed} entries from database that don't have audio files")
         else:
             st.info("Database is already clean!")
 
-# Function to get downloaded videos
-def get_downloaded_videos():
-    data_dir = Path('data')
-    data_dir.mkdir(exist_ok=True)
-    excel_file = data_dir / 'youtube_videos.xlsx'
-    final_result_dir = data_dir / 'final_result'
-    
-    try:
-        # Create directories if they don't exist
-        os.makedirs(final_result_dir, exist_ok=True)
-        
-        # Get list of downloaded audio files from the new directory structure
-        downloaded_files = {}
-        if final_result_dir.exists():
-            for video_dir in final_result_dir.iterdir():
-                if video_dir.is_dir():
-                    vid_id = video_dir.name
-                    audio_file = video_dir / 'original' / f'{vid_id}.mp3'
-                    if audio_file.exists():
-                        downloaded_files[vid_id] = str(audio_file)
-        
-        if not downloaded_files:
-            st.info('No audio files have been downloaded yet. Go to the Search page to download some videos!')
-            return []
-        
-        # Load Excel data
-        try:
-            df = pd.read_excel(excel_file)
-        except FileNotFoundError:
-            st.warning('YouTube videos database not found. Downloaded files may not have complete information.')
-            return [{'id': vid_id, 'title': 'Unknown Title'} for vid_id in downloaded_files.keys()]
-        
-        # Filter for downloaded videos only
-        downloaded_videos = []
-        for _, row in df.iterrows():
-            vid_id = str(row['id'])
-            if vid_id in downloaded_files:
-                video_info = row.to_dict()
-                video_info['file_name'] = f'{vid_id}.mp3'
-                video_info['file_path'] = downloaded_files[vid_id]
-                downloaded_videos.append(video_info)
-        
-        return downloaded_videos
-        
-    except Exception as e:
-        st.error(f'Error loading downloaded videos: {str(e)}')
-        return []
+    st.markdown("---")
+    st.subheader("Transcription Cache")
+    cache_stats = transcription_service.get_cache_stats()
+    st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}",
+              help=f"{cache_stats['hits']} hits / {cache_stats['misses']} misses since start")
+    st.caption(f"{cache_stats['entries']:,} entries, "
+               f"{cache_stats['size_bytes'] / (1024 * 1024):.1f} of "
+               f"{cache_stats['max_bytes'] / (1024 * 1024):.0f} MB")
+
+def get_page_videos(downloaded_ids):
+    """Get the current page of downloaded videos from the catalog."""
+    videos, total = data_service.query_videos(
+        order='asc',
+        page=st.session_state.downloaded_page,
+        page_size=st.session_state.downloaded_per_page,
+        video_ids=downloaded_ids
+    )
+    final_result_dir = Path('data') / 'final_result'
+    # Latest processing job of every video on the page, in one query
+    jobs = get_video_jobs([video_info['id'] for video_info in videos])
+    for video_info in videos:
+        vid_id = str(video_info['id'])
+        video_info['file_name'] = f'{vid_id}.mp3'
+        video_info['file_path'] = str(final_result_dir / vid_id / 'original' / f'{vid_id}.mp3')
+        video_info['job'] = jobs.get(vid_id)
+    return videos, total
+
+# Get downloaded video IDs
+storage_stages = artifact_index.get_stage_ids()
+downloaded_ids = storage_stages['downloaded']
+
+# Transcription queue
+scheduler = get_scheduler()
+st.markdown("### Transcription Queue")
+queue_status = scheduler.get_status()
+queue_cols = st.columns(5)
+for queue_col, status in zip(queue_cols, ['queued', 'running', 'done', 'skipped', 'failed']):
+    with queue_col:
+        st.metric(status.title(), f"{queue_status.get(status, 0):,}")
+
+untranscribed = sorted(storage_stages['downloaded'] - storage_stages['transcribed'])
+
+def queue_videos(video_ids, priority):
+    added = scheduler.enqueue(video_ids, priority=priority)
+    scheduler.start()
+    st.success(f"✅ Queued {added} videos for transcription.")
+
+# The policy is shared by every session, so only an explicit change saves it
+st.session_state.scheduling_policy = scheduler.get_policy()
+col1, col2, col3 = st.columns([2, 1, 2])
+with col1:
+    st.selectbox(
+        "Scheduling Policy",
+        options=list(POLICIES.keys()),
+        format_func=lambda x: POLICIES[x],
+        key='scheduling_policy',
+        on_change=lambda: scheduler.set_policy(st.session_state.scheduling_policy)
+    )
+with col2:
+    queue_priority = st.number_input(
+        "Priority", min_value=0, max_value=100, value=0, step=1,
+        help="Higher runs first with the Priority policy; re-queueing a queued video updates its priority"
+    )
+with col3:
+    st.write("")
+    if st.button("🎯 Queue All Untranscribed Videos"):
+        queue_videos(untranscribed, queue_priority)
+
+with st.expander("Queue selected videos"):
+    selected_ids = st.multiselect(
+        "Videos",
+        options=untranscribed,
+        format_func=lambda vid: f"{(data_service.get_video_info(vid) or {}).get('title', vid)} ({vid})"
+    )
+    if st.button("🎯 Queue Selected", disabled=not selected_ids):
+        queue_videos(selected_ids, queue_priority)
 
-# Get downloaded videos
-downloaded_videos = get_downloaded_videos()
+if scheduler.is_running():
+    st.caption("⏳ Scheduler is transcribing in the background.")
+
+st.markdown("---")
 
-def display_stats(df):
+def display_stats(video_ids, stats):
     """Display statistics about downloaded files"""
-    total_files = len(df)
+    total_files = stats['videos']
     
-    # Calculate total size
-    total_size_mb = sum(os.path.getsize(file_info['file_path']) / (1024 * 1024) 
-                       for file_info in df 
-                       if os.path.exists(file_info['file_path']))
+    # Calculate total size from the artifact index
+    total_size_mb = sum(
+        entry['original_size'] or 0 for entry in artifact_index.get_entries(video_ids)
+    ) / (1024 * 1024)
     
-    # Calculate total duration in seconds
-    total_duration_sec = sum(duration_to_seconds(file_info['duration']) 
-                           for file_info in df)
+    # Total duration in seconds, summed in SQL
+    total_duration_sec = stats['duration_seconds']
     
     # Convert total duration to hours:minutes:seconds
     hours = total_duration_sec // 3600
@@ -185,40 +212,22 @@ def display_stats(df):
     
     st.markdown("---")
 
-def duration_to_seconds(duration_str):
-    """Convert duration string (HH:MM:SS) to seconds"""
-    try:
-        # Handle different duration formats
-        if ':' not in duration_str:
-            return 0
-        
-        parts = duration_str.split(':')
-        if len(parts) == 3:  # HH:MM:SS
-            h, m, s = parts
-            return int(h) * 3600 + int(m) * 60 + int(s)
-        elif len(parts) == 2:  # MM:SS
-            m, s = parts
-            return int(m) * 60 + int(s)
-        else:
-            return 0
-    except:
-        return 0
-
 def display_downloaded_file(file_info, col):
     """Display a single downloaded file with audio player and processing options."""
     video_id = file_info['id']
     file_path = file_info['file_path']
     grid_position = f"downloaded_{video_id}"
+    artifacts = artifact_index.get(video_id) or {}
     
     with col:
         if 'thumbnail' in file_info:
             st.image(file_info['thumbnail'], width=None, caption=file_info['title'])
 
-        # Process existing transcription
-        existing_transcription = transcription_service.get_transcription(video_id)
-        has_wav_splits = audio_splitter.has_wav_splits(video_id)
-        has_splits = audio_splitter.has_splits(video_id)
-        has_converted = audio_service.get_converted_file(video_id)
+        # Artifact status comes from the in-memory index, not the disk
+        existing_transcription = bool(artifacts.get('transcription'))
+        has_wav_splits = bool(artifacts.get('wav_split_count'))
+        has_splits = bool(artifacts.get('split_count'))
+        has_converted = artifacts.get('converted_size') is not None
         
         if has_wav_splits:
             st.success("✅ Transcription and WAV audio segments are available")
@@ -232,7 +241,7 @@ def display_downloaded_file(file_info, col):
             st.success("✅ Downloaded")
 
         # Display audio player
-        ogg_file = audio_service.get_converted_file(video_id)
+        ogg_file = artifacts['converted_path'] if has_converted else None
         audio_file = str(ogg_file) if ogg_file else file_path
         file_format = "OGG" if ogg_file else "MP3"
         
@@ -250,61 +259,55 @@ def display_downloaded_file(file_info, col):
         if 'published_at' in file_info:
             st.markdown(f"**Published:** {file_info['published_at']}")
         
-        # Process existing transcription
-        # existing_transcription = transcription_service.get_transcription(video_id)
+        # Progress of queued or running work, or the last failure
+        job = file_info.get('job')
+        job_active = is_job_active(job)
+        show_job_status(job)
         
         if existing_transcription:
-            if not has_wav_splits:             
-                # Handle split audio button and processing
-                if not get_processing_state(video_id, grid_position, "split"):
-                    if st.button("✂️ Split Audio", key=f"split_{video_id}_{grid_position}"):
-                        set_processing_state(video_id, grid_position, "split", True)
-                        st.rerun()
-                
-                if get_processing_state(video_id, grid_position, "split"):
-                    handle_split_audio(video_id, file_path, grid_position, audio_splitter, transcription_service)
+            if not has_wav_splits and not job_active:
+                # Handle split audio button
+                if st.button("✂️ Split Audio", key=f"split_{video_id}_{grid_position}"):
+                    submit_job(video_id, 'split')
+                    st.rerun()
             
             if st.button("📝 View Transcription", key=f"view_transcription_{video_id}_{grid_position}"):
                 st.session_state['selected_video_id'] = video_id
                 st.switch_page("pages/3_📝_Transcriptions.py")
                 
-        elif has_converted:
-            # Handle transcribe button and processing
-            if not get_processing_state(video_id, grid_position, "transcribe"):
-                if st.button("🎯 Transcribe", key=f"transcribe_{video_id}_{grid_position}"):
-                    set_processing_state(video_id, grid_position, "transcribe", True)
-                    st.rerun()
+        elif job_active:
+            pass
             
-            if get_processing_state(video_id, grid_position, "transcribe"):
-                handle_transcription(video_id, file_path, grid_position, transcription_service, audio_splitter)
+        elif has_converted:
+            # Handle transcribe button
+            if st.button("🎯 Transcribe", key=f"transcribe_{video_id}_{grid_position}"):
+                submit_job(video_id, 'transcribe')
+                st.rerun()
                 
         else:
-            # Handle convert button and processing
-            if not get_processing_state(video_id, grid_position, "convert"):
-                if st.button("🔄 Convert to OGG", key=f"convert_{video_id}_{grid_position}"):
-                    set_processing_state(video_id, grid_position, "convert", True)
-                    st.rerun()
-            
-            if get_processing_state(video_id, grid_position, "convert"):
-                handle_conversion(video_id, file_path, grid_position, audio_service, 
-                               transcription_service, audio_splitter)
+            # Handle convert button
+            if st.button("🔄 Convert to OGG", key=f"convert_{video_id}_{grid_position}"):
+                submit_job(video_id, 'convert')
+                st.rerun()
         
         # Display file size
-        file_size = os.path.getsize(file_path) / (1024 * 1024)
+        file_size = (artifacts.get('original_size') or 0) / (1024 * 1024)
         st.markdown(f"**Size:** {file_size:.1f} MB")
         
         st.divider()
 
-if not downloaded_videos:
+downloaded_stats = data_service.get_video_stats(video_ids=downloaded_ids)
+
+if not downloaded_ids:
     st.info("❌ No downloaded files found. Go to Search page to download some audio!")
+elif not downloaded_stats['videos']:
+    st.warning('YouTube videos database has no entries for the downloaded files. Search for them again to restore their information.')
 else:
-    display_stats(downloaded_videos)
+    display_stats(downloaded_ids, downloaded_stats)
     
-    # Calculate pagination
-    total_pages = math.ceil(len(downloaded_videos) / st.session_state.downloaded_per_page)
-    start_idx = (st.session_state.downloaded_page - 1) * st.session_state.downloaded_per_page
-    end_idx = start_idx + st.session_state.downloaded_per_page
-    current_videos = downloaded_videos[start_idx:end_idx]
+    # Fetch only the current page from the catalog
+    current_videos, total_videos = get_page_videos(downloaded_ids)
+    total_pages = math.ceil(total_videos / st.session_state.downloaded_per_page)
     
     # Display videos in grid
     cols = st.columns(3)
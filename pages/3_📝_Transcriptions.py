@@ -2,15 +2,13 @@ import streamlit as st
 from domain.transcription_service import TranscriptionService
 from domain.audio_splitter import AudioSplitter
 from domain.data_service import DataService
-from domain.audio_service import AudioService
 from ui.process_handlers import (
-    get_processing_state,
-    set_processing_state,
-    handle_split_audio
+    submit_job,
+    get_video_jobs,
+    is_job_active,
+    show_job_status
 )
 
-audio_service = AudioService()
-
 # Page config
 st.set_page_config(
     page_title="Transcriptions",
@@ -31,13 +29,54 @@ transcription_service = TranscriptionService(api_key=st.session_state.openai_api
 audio_splitter = AudioSplitter()
 data_service = DataService()
 
+# Full-text search across all transcriptions
+search_index = transcription_service.store.get_search_index()
+
+def list_video_dirs():
+    """Videos with files on disk that are still in the catalog."""
+    catalog_ids = set(data_service.get_videos_dataframe()['id'])
+    return [d.name for d in transcription_service.final_result_dir.iterdir() if d.is_dir() and d.name in catalog_ids]
+
+# Index transcriptions that existed before this process started
+if not search_index.synced:
+    with st.spinner("Updating search index..."):
+        search_index.sync_once(transcription_service.store, list_video_dirs())
+
+with st.sidebar:
+    if st.button("🔄 Rebuild Search Index", help="Re-index changed transcriptions and drop removed ones"):
+        with st.spinner("Indexing transcriptions..."):
+            updated = search_index.sync(transcription_service.store, list_video_dirs(), prune=True)
+        st.success(f"Updated {updated} transcriptions")
+
+search_query = st.text_input("🔍 Search all transcriptions", placeholder="Enter words to find in any video")
+if search_query:
+    results = search_index.search(search_query, limit=20)
+    if not results:
+        st.info("No matching segments found.")
+    for result_idx, result in enumerate(results):
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(
+                f"**{result['video_id']}** · {result['start_time']:.2f}s - {result['end_time']:.2f}s  \n"
+                f"{result['snippet']}"
+            )
+        with col2:
+            if st.button("Open", key=f"search_result_{result_idx}"):
+                st.session_state['selected_video_id'] = result['video_id']
+                st.session_state['focus_segment_start'] = result['start_time']
+                st.rerun()
+    st.divider()
+
 # Check if video ID is in session state
 if 'selected_video_id' not in st.session_state:
     st.warning("⚠️ No transcription selected. Please select a transcription from the Downloaded page.")
     st.stop()
 
 video_id = st.session_state['selected_video_id']
-splits = audio_splitter.get_splits(transcription_service.get_excel_path(video_id))
+splits = audio_splitter.get_splits(video_id)
+if not splits:
+    # Fall back to segments rendered on demand from the source audio
+    splits = audio_splitter.get_virtual_splits(video_id)
 
 # Get video info
 video_info = data_service.get_video_info(video_id)
@@ -72,19 +111,17 @@ if video_info:
         # Show split button if no WAV splits exist
         if not audio_splitter.has_wav_splits(video_id):
             grid_position = f"transcribe_{video_id}"
-            if not get_processing_state(video_id, grid_position, "split"):
+            job = get_video_jobs([video_id]).get(video_id)
+            show_job_status(job)
+            if not is_job_active(job):
                 if st.button("✂️ Split Audio", key=f"split_{video_id}_{grid_position}"):
-                    set_processing_state(video_id, grid_position, "split", True)
+                    submit_job(video_id, 'split', chain=False)
                     st.rerun()
-            
-            if get_processing_state(video_id, grid_position, "split"):
-                file_path = audio_service.get_converted_file(video_id)
-                handle_split_audio(video_id, file_path, grid_position, audio_splitter, transcription_service)
 
 st.divider()
 
 if not splits:
-    st.error("❌ No audio segments found for this transcription.")
+    st.error("❌ No transcription segments found for this video.")
 
 # Initialize expanded states in session state if not exists
 if 'expanded_segments' not in st.session_state:
@@ -98,8 +135,10 @@ for idx, split in enumerate(splits, 1):
     if segment_key not in st.session_state.expanded_segments:
         st.session_state.expanded_segments[segment_key] = False
     
-    # Create expander
-    with st.expander(f"🎵 - 📝 Segment {idx}"):
+    # Create expander, opened if a search result jumped to this segment
+    focus_start = st.session_state.get('focus_segment_start')
+    is_focused = focus_start is not None and abs(split['start_time_seconds'] - focus_start) < 0.001
+    with st.expander(f"🎵 - 📝 Segment {idx}", expanded=is_focused):
         st.markdown(f"**Time**: {split['start_time_seconds']:.2f}s - {split['end_time_seconds']:.2f}s")
         st.markdown(split['text'])
         
@@ -108,9 +147,12 @@ for idx, split in enumerate(splits, 1):
         
         # Only load audio if checkbox is checked
         if load_audio:
-            split_audio_path = audio_splitter.get_splitted_audio_path(video_id, split['audio_file'])
+            segment_audio = audio_splitter.get_segment_audio(video_id, split)
             # Audio player
-            st.audio(split_audio_path)
+            if segment_audio is None:
+                st.warning("⚠️ Source audio not found for this segment.")
+            else:
+                st.audio(segment_audio, format="audio/wav")
             # Show segment duration
             st.caption(f"Duration: {split['duration_seconds']:.2f} seconds")
 
@@ -121,4 +163,6 @@ if st.button("← Back to Downloads"):
         del st.session_state['selected_video_id']
     if 'expanded_segments' in st.session_state:
         del st.session_state['expanded_segments']
+    if 'focus_segment_start' in st.session_state:
+        del st.session_state['focus_segment_start']
     st.switch_page("pages/2_📂_Downloaded.py")
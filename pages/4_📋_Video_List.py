@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-import os
 from pathlib import Path
 from domain.data_service import DataService
-from domain.youtube_service import YouTubeService
+from ui.process_handlers import submit_job
 from utils.date_formatter import format_published_date
 import math
 
@@ -16,7 +15,6 @@ st.set_page_config(
 
 # Initialize services
 data_service = DataService()
-youtube_service = YouTubeService(os.getenv('YOUTUBE_API_KEY'))
 
 # Custom CSS
 st.markdown("""
@@ -74,40 +72,14 @@ if 'channel_filter' not in st.session_state:
 st.title('📋 Video List')
 st.markdown('View and manage your saved YouTube videos')
 
-def duration_to_seconds(duration_str):
-    """Convert duration string (HH:MM:SS or MM:SS) to seconds"""
-    try:
-        parts = duration_str.split(':')
-        if len(parts) == 2:  # MM:SS
-            return int(parts[0]) * 60 + int(parts[1])
-        elif len(parts) == 3:  # HH:MM:SS
-            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-        return 0
-    except:
-        return 0
-
-def get_video_list():
-    """Get the list of videos from Excel file"""
-    try:
-        df = pd.read_excel(data_service.videos_excel)
-        # Print column names for debugging
-        print("Available columns:", df.columns.tolist())
-        
-        # Add duration_seconds column for sorting
-        df['duration_seconds'] = df['duration'].apply(duration_to_seconds)
-        return df
-    except Exception as e:
-        st.error(f"Error reading Excel file: {str(e)}")
-        return pd.DataFrame()
-
-def display_stats(df):
+def display_stats(stats):
     """Display statistics about the video list"""
-    if df.empty:
+    if not stats['videos']:
         return
     
-    total_videos = len(df)
-    total_duration = df['duration'].apply(lambda x: sum(int(i) * 60 ** idx for idx, i in enumerate(reversed(str(x).split(':'))))).sum()
-    unique_channels = df['channel_title'].nunique()
+    total_videos = stats['videos']
+    total_duration = stats['duration_seconds']
+    unique_channels = stats['channels']
     
     # Convert total duration to hours:minutes:seconds
     hours = total_duration // 3600
@@ -145,7 +117,8 @@ def display_video_info(video, col):
             with col1:
                 if st.button("🎵 Download", key=f"download_{video['id']}"):
                     st.session_state.download_states[video['id']] = 'downloading'
-                    youtube_service.download_audio(video['id'], video['title'])
+                    submit_job(video['id'], 'download', chain=False)
+                    st.toast(f"🎵 Queued download of {video['title']}")
             
             with col2:
                 if st.button("🔗 Watch", key=f"watch_{video['id']}"):
@@ -182,36 +155,41 @@ def display_video_info(video, col):
                         st.session_state.video_to_delete_title = None
                         st.rerun()
 
-# Get video list
-video_list = get_video_list()
+# Catalog-wide statistics, computed in SQL
+stats = data_service.get_video_stats()
 
 # Sidebar controls
 with st.sidebar:
     st.subheader("Sort Options")
     if st.button("Sort by Longest Duration ⏱️", use_container_width=True):
-        # Convert duration to seconds for sorting
-        video_list['duration_seconds'] = video_list['duration'].apply(duration_to_seconds)
+        video_list = data_service.get_videos_dataframe()
         video_list = video_list.sort_values('duration_seconds', ascending=False)
-        video_list = video_list.drop('duration_seconds', axis=1)
-        # Save the sorted data back to Excel using the correct path
-        video_list.to_excel(data_service.videos_excel, index=False)
+        # Save the sorted order back to the catalog
+        data_service.replace_videos(video_list)
         st.success("Videos sorted by duration and saved!")
         st.rerun()
 
     st.subheader("Clean Data")
     if st.button("Remove Duplicate Titles 🧹", use_container_width=True):
         # Keep only the first occurrence of each title
+        video_list = data_service.get_videos_dataframe()
         video_list = video_list.drop_duplicates(subset=['title'], keep='first')
-        # Save the deduplicated data back to Excel
-        video_list.to_excel(data_service.videos_excel, index=False)
+        # Save the deduplicated data back to the catalog
+        data_service.replace_videos(video_list)
         st.success("Duplicate videos removed!")
         st.rerun()
 
-if video_list.empty:
+    st.subheader("Export")
+    if st.button("Export to Excel 📤", use_container_width=True):
+        excel_file = data_service.export_videos_to_excel()
+        if excel_file:
+            st.success(f"Catalog exported to {excel_file}")
+
+if not stats['videos']:
     st.info("No videos found in the database. Search and save some videos first!")
 else:
     # Display statistics
-    display_stats(video_list)
+    display_stats(stats)
     
     # Sorting controls
     st.markdown("### Sort Videos")
@@ -253,14 +231,6 @@ else:
             key='sort_order'
         )
     
-    # Apply channel filter
-    if selected_channel != "All Channels":
-        video_list = video_list[video_list['channel_title'] == selected_channel]
-    
-    # Apply sorting
-    ascending = selected_order == 'asc'
-    video_list = video_list.sort_values(by=selected_sort, ascending=ascending)
-    
     # Reset to first page when sort changes
     if 'last_sort' not in st.session_state or 'last_order' not in st.session_state:
         st.session_state.last_sort = selected_sort
@@ -270,18 +240,19 @@ else:
         st.session_state.last_sort = selected_sort
         st.session_state.last_order = selected_order
     
-    # Pagination
-    total_videos = len(video_list)
+    # Fetch only the current page; filtering, sorting and paging run in SQL
+    current_videos, total_videos = data_service.query_videos(
+        channel=selected_channel,
+        sort_key=selected_sort,
+        order=selected_order,
+        page=st.session_state.list_page,
+        page_size=st.session_state.list_per_page
+    )
     total_pages = math.ceil(total_videos / st.session_state.list_per_page)
-    start_idx = (st.session_state.list_page - 1) * st.session_state.list_per_page
-    end_idx = start_idx + st.session_state.list_per_page
-    
-    # Display videos in grid
-    current_videos = video_list.iloc[start_idx:end_idx]
     
     # Create columns for the grid
     cols = st.columns(3)
-    for idx, (_, video) in enumerate(current_videos.iterrows()):
+    for idx, video in enumerate(current_videos):
         display_video_info(video, cols[idx % 3])
     
     # Pagination controls
@@ -0,0 +1,182 @@
+import streamlit as st
+import pandas as pd
+import datetime
+from domain.job_queue import STAGES, PROGRESS_STAGES
+from ui.process_handlers import STAGE_LABELS, get_runner
+
+# Page config
+st.set_page_config(
+    page_title='Jobs',
+    page_icon='📊',
+    layout='wide'
+)
+
+# Start the workers if this is the first page opened, so retried jobs get
+# picked up and jobs of dead workers are requeued instead of shown as running
+job_store = get_runner().store
+
+WINDOWS = {
+    'Last 15 minutes': 15 * 60,
+    'Last hour': 60 * 60,
+    'Last 6 hours': 6 * 60 * 60,
+    'Last 24 hours': 24 * 60 * 60,
+}
+
+def format_seconds(seconds):
+    """Format a duration as e.g. '45s', '12m 5s' or '2h 3m'."""
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+def format_time(timestamp):
+    if not timestamp:
+        return '-'
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+def find_bottleneck(counts, stats):
+    """Pick the stage with the longest estimated time to drain its queue."""
+    backlog = {}
+    for stage in STAGES:
+        queued = counts[stage]['queued']
+        stage_stats = stats[stage]
+        if queued and stage_stats['run_p50']:
+            backlog[stage] = queued * stage_stats['run_p50'] / max(stage_stats['workers'], 1)
+    if not backlog:
+        return None, None
+    stage = max(backlog, key=backlog.get)
+    return stage, backlog[stage]
+
+def display_stage_table(counts, stats):
+    """One row per stage: queue, throughput, latency and utilization."""
+    rows = []
+    for stage in STAGES:
+        stage_counts, stage_stats = counts[stage], stats[stage]
+        utilization = stage_stats['utilization']
+        rows.append({
+            'Stage': STAGE_LABELS[stage],
+            'Queued': stage_counts['queued'],
+            'Running': stage_counts['running'],
+            'Failed': stage_counts['failed'],
+            'Done': stage_counts['done'],
+            'Workers': f"{stage_stats['busy_workers']}/{stage_stats['workers']} busy",
+            'Utilization': f"{utilization:.0%}" if utilization is not None else '-',
+            'Videos/h': round(stage_stats['videos_per_hour'], 1),
+            'Audio h/h': round(stage_stats['audio_hours_per_hour'], 2),
+            'Run p50': format_seconds(stage_stats['run_p50']),
+            'Run p95': format_seconds(stage_stats['run_p95']),
+            'Wait p50': format_seconds(stage_stats['wait_p50']),
+            'Wait p95': format_seconds(stage_stats['wait_p95']),
+        })
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+def display_running_jobs():
+    running = job_store.get_jobs(status='running', limit=50)
+    st.subheader(f"🏃 Running ({len(running)})")
+    if not running:
+        st.caption("No jobs are running.")
+    for job in running:
+        elapsed = datetime.datetime.now().timestamp() - job['started_at'] if job['started_at'] else None
+        label = f"{STAGE_LABELS[job['stage']]} `{job['video_id']}`"
+        if job['stage'] in PROGRESS_STAGES:
+            st.progress(
+                min(job['progress'], 1.0),
+                text=f"{label} — {job['progress']:.0%}, {format_seconds(elapsed)} on {job['worker']}"
+            )
+        else:
+            st.markdown(f"{label} — running for {format_seconds(elapsed)} on {job['worker']}")
+
+def display_queued_jobs(counts):
+    total = sum(counts[stage]['queued'] for stage in STAGES)
+    st.subheader(f"⏳ Queued ({total})")
+    queued = job_store.get_jobs(status='queued', limit=20)
+    if not queued:
+        st.caption("The queue is empty.")
+        return
+    st.dataframe(
+        pd.DataFrame([{
+            'Stage': STAGE_LABELS[job['stage']],
+            'Video ID': job['video_id'],
+            'Priority': job['priority'],
+            'Queued At': format_time(job['enqueued_at']),
+        } for job in queued]),
+        hide_index=True,
+        use_container_width=True
+    )
+    if total > len(queued):
+        st.caption(f"Showing the {len(queued)} most recent of {total} queued jobs.")
+
+def display_failed_jobs(stage_filter):
+    failed = job_store.get_jobs(status='failed', stage=stage_filter, limit=20)
+    st.subheader("❌ Recent Failures")
+    if not failed:
+        st.caption("No failed jobs.")
+        return
+    for job in failed:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(
+                f"**{STAGE_LABELS[job['stage']]}** `{job['video_id']}` "
+                f"({format_time(job['finished_at'])}, attempt {job['attempts']})"
+            )
+            st.caption(job['error'] or 'No error message')
+        with col2:
+            if st.button("🔁 Retry", key=f"retry_{job['id']}"):
+                job_store.retry(job['id'])
+                st.rerun(scope='fragment')
+
+# Sidebar controls
+with st.sidebar:
+    st.subheader("Dashboard")
+    window_label = st.selectbox("Statistics window", list(WINDOWS), index=1)
+    refresh_interval = st.select_slider("Refresh every (seconds)", options=[2, 5, 10, 30, 60], value=5)
+    stage_filter = st.selectbox(
+        "Failures of stage",
+        [None, *STAGES],
+        format_func=lambda stage: 'All stages' if stage is None else STAGE_LABELS[stage]
+    )
+
+st.title("📊 Jobs")
+st.caption("Pipeline queue, throughput and worker utilization. Use it to find the slowest stage and size its worker pool (`JOB_WORKERS_<STAGE>`).")
+
+@st.fragment(run_every=refresh_interval)
+def display_dashboard():
+    counts = job_store.get_counts()
+    stats = job_store.get_stats(window=WINDOWS[window_label])
+    completion_rate = job_store.get_completion_rate(window=WINDOWS[window_label])
+
+    # Overall metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Queued", sum(counts[stage]['queued'] for stage in STAGES))
+    with col2:
+        st.metric("Running", sum(counts[stage]['running'] for stage in STAGES))
+    with col3:
+        st.metric("Videos/hour", f"{completion_rate:.1f}",
+                  help="Videos that finished the last stage they were queued for")
+    with col4:
+        st.metric("Audio hours/hour", f"{stats['transcribe']['audio_hours_per_hour']:.2f}",
+                  help="Hours of audio transcribed per hour")
+
+    bottleneck, backlog_seconds = find_bottleneck(counts, stats)
+    if bottleneck:
+        st.info(f"🐢 Bottleneck: **{STAGE_LABELS[bottleneck]}**, about {format_seconds(backlog_seconds)} "
+                f"of queued work with {stats[bottleneck]['workers']} workers")
+
+    st.subheader(f"Stages ({window_label.lower()})")
+    display_stage_table(counts, stats)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        display_running_jobs()
+    with col2:
+        display_queued_jobs(counts)
+
+    display_failed_jobs(stage_filter)
+    st.caption(f"Updated {datetime.datetime.now().strftime('%H:%M:%S')}")
+
+display_dashboard()
@@ -0,0 +1,45 @@
+import shutil
+import subprocess
+import pytest
+from utils import ffmpeg
+from utils.ffmpeg import render_segment
+from domain.transcription_cache import TranscriptionCache
+
+# Same profile as TranscriptionService.TRANSCRIPTION_AUDIO_PARAMETERS
+OPUS_PARAMETERS = ['-ac', '1', '-ar', '16000', '-c:a', 'libopus', '-b:a', '24k', '-application', 'voip']
+
+
+def test_encodes_are_bitexact(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        if command[-1].endswith('.tmp'):
+            open(command[-1], 'wb').close()
+        return subprocess.CompletedProcess(command, 0, stdout=b'', stderr=b'')
+
+    monkeypatch.setattr(ffmpeg.subprocess, 'run', fake_run)
+    render_segment('source.mp3', 0, 10, output_format='ogg', parameters=OPUS_PARAMETERS)
+    ffmpeg.transcode('source.mp3', tmp_path / 'out.ogg', OPUS_PARAMETERS)
+
+    for command in commands:
+        assert '+bitexact' in command[command.index('-fflags') + 1]
+        assert '+bitexact' in command[command.index('-flags:a') + 1]
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_reencoded_chunk_has_same_cache_key(tmp_path):
+    source = tmp_path / 'tone.wav'
+    subprocess.run(
+        ['ffmpeg', '-nostdin', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=5', str(source)],
+        check=True
+    )
+
+    keys = [
+        TranscriptionCache.make_key(
+            render_segment(source, 1, 2, output_format='ogg', parameters=OPUS_PARAMETERS),
+            'whisper-1', 'id', 'verbose_json'
+        )
+        for _ in range(2)
+    ]
+    assert keys[0] == keys[1]
@@ -1,115 +1,80 @@
-"""Handlers for audio processing operations."""
-import streamlit as st
-from domain.youtube_service import YouTubeService
-from domain.audio_service import AudioService
-from domain.transcription_service import TranscriptionService
-from domain.audio_splitter import AudioSplitter
+"""Handlers for audio processing operations.
 
-def get_processing_state(video_id: str, grid_position: str, action: str) -> bool:
-    """Get the processing state for a specific action."""
-    state_key = f"{action}_processing_{video_id}_{grid_position}"
-    if state_key not in st.session_state:
-        st.session_state[state_key] = False
-    return st.session_state[state_key]
+Processing runs as jobs in the background job runner, so it keeps going
+when the user navigates away. The UI only submits jobs and polls their
+status.
+"""
+import streamlit as st
+from domain.job_queue import get_job_runner
+from domain.artifact_index import get_artifact_index
+from domain.transcription_service import get_allowed_languages
 
-def set_processing_state(video_id: str, grid_position: str, action: str, state: bool):
-    """Set the processing state for a specific action."""
-    state_key = f"{action}_processing_{video_id}_{grid_position}"
-    st.session_state[state_key] = state
+STAGE_LABELS = {
+    'download': 'Downloading',
+    'convert': 'Converting to OGG',
+    'transcribe': 'Transcribing',
+    'split': 'Splitting audio',
+}
 
-def handle_process_error(error: Exception, video_id: str, grid_position: str, action: str):
-    """Handle process errors uniformly."""
-    st.error(f"❌ An error occurred: {str(error)}")
-    set_processing_state(video_id, grid_position, action, False)
-    st.rerun()
+def get_runner():
+    """Get the process-wide job runner, started on first use."""
+    return get_job_runner()
 
-def handle_split_audio(video_id: str, file_path: str, grid_position: str, audio_splitter: AudioSplitter, transcription_service: TranscriptionService):
-    """Handle the audio splitting process."""
+def refresh_artifacts(video_id: str):
+    """Update the artifact index right away instead of waiting for the watcher."""
     try:
-        with st.spinner("Splitting audio based on transcription..."):
-            split_success, split_result = audio_splitter.split_audio(
-                file_path,
-                video_id,
-                transcription_service.get_excel_path(video_id),
-                'wav'
-            )
-            if not split_success:
-                st.warning(f"⚠️ Audio split failed: {split_result}")
-        
-        set_processing_state(video_id, grid_position, "split", False)
-        st.rerun()
+        get_artifact_index().refresh_video(video_id)
     except Exception as e:
-        handle_process_error(e, video_id, grid_position, "split")
+        print(f"[WARNING] Could not refresh artifacts of {video_id}: {e}")
 
-def handle_transcription(video_id: str, file_path: str, grid_position: str, 
-                        transcription_service: TranscriptionService, 
-                        audio_splitter: AudioSplitter):
-    """Handle the audio transcription process."""
-    try:
-        transcribe_success = False
-        with st.spinner("Transcribing audio..."):
-            transcribe_success, transcribe_result = transcription_service.transcribe_audio(file_path, video_id)
-            if not transcribe_success:
-                st.warning(f"⚠️ Audio transcription failed: {transcribe_result}")
-                set_processing_state(video_id, grid_position, "transcribe", False)
-                st.rerun()
-        
-        # Proceed with splitting if transcription was successful
-        if transcribe_success:
-            handle_split_audio(video_id, file_path, grid_position, audio_splitter, transcription_service)
-        
-        set_processing_state(video_id, grid_position, "transcribe", False)
-        st.rerun()
-    except Exception as e:
-        handle_process_error(e, video_id, grid_position, "transcribe")
+def submit_job(video_id: str, stage: str, chain: bool = True, **params) -> int:
+    """Queue a processing stage for a video.
 
-def handle_conversion(video_id: str, file_path: str, grid_position: str, 
-                     audio_service: AudioService, transcription_service: TranscriptionService,
-                     audio_splitter: AudioSplitter):
-    """Handle the audio conversion process."""
-    try:
-        convert_success = False
-        with st.spinner("Converting to OGG format..."):
-            convert_success, convert_result = audio_service.convert_to_ogg(file_path, video_id)
-            if not convert_success:
-                st.error(f"❌ Conversion failed: {convert_result}")
-                set_processing_state(video_id, grid_position, "convert", False)
+    Args:
+        video_id: Video to process
+        stage: 'download', 'convert', 'transcribe' or 'split'
+        chain: Queue the following stages automatically when this one succeeds
+        params: Stage options, e.g. language or redetect for 'transcribe'
+    """
+    return get_runner().store.submit(stage, video_id, {'chain': chain, **params})
+
+def get_video_jobs(video_ids) -> dict:
+    """Get the latest job of each video in one query."""
+    return get_runner().store.get_latest_jobs(video_ids)
+
+def is_job_active(job) -> bool:
+    return job is not None and job['status'] in ('queued', 'running')
+
+def show_job_status(job):
+    """Show a video's latest job: live progress while active, the error if it failed."""
+    if is_job_active(job):
+        _poll_job(job['id'])
+    elif job and job['status'] == 'failed':
+        st.warning(f"⚠️ {STAGE_LABELS[job['stage']]} failed: {job['error']}")
+    elif job and job['status'] == 'skipped':
+        # The language probe decided against transcribing; let the user overrule it
+        st.info(f"⏭️ Transcription skipped: {job['error']}")
+        chain = job['params'].get('chain', True)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔁 Detect Again", key=f"redetect_{job['id']}"):
+                submit_job(job['video_id'], 'transcribe', chain=chain, redetect=True)
+                st.rerun()
+        with col2:
+            language = get_allowed_languages()[0]
+            if st.button(f"🎯 Transcribe as '{language}'", key=f"force_language_{job['id']}"):
+                submit_job(job['video_id'], 'transcribe', chain=chain, language=language)
                 st.rerun()
-        
-        # Proceed with transcription if conversion was successful
-        if convert_success:
-            handle_transcription(video_id, file_path, grid_position, transcription_service, audio_splitter)
-        
-        set_processing_state(video_id, grid_position, "convert", False)
-        st.rerun()
-    except Exception as e:
-        handle_process_error(e, video_id, grid_position, "convert")
 
-def handle_download(video_id: str, grid_position: str, youtube_service: YouTubeService,
-                   audio_service: AudioService, transcription_service: TranscriptionService,
-                   audio_splitter: AudioSplitter):
-    """Handle the video download process."""
-    try:
-        progress_bar = st.progress(0, text="Starting download...")
-        result = youtube_service.download_audio(
-            video_id,
-            progress_callback=lambda p: progress_bar.progress(int(p)/100, text=f"Downloading... {int(p)}%")
-        )
-        
-        if not result['success']:
-            progress_bar.empty()
-            st.error("❌ Download failed")
-            set_processing_state(video_id, grid_position, "download", False)
-            st.rerun()
-        
-        progress_bar.empty()
-        mp3_path = youtube_service.get_source_path(video_id)
-        
-        # Proceed with conversion after successful download
-        handle_conversion(video_id, mp3_path, grid_position, audio_service, 
-                         transcription_service, audio_splitter)
-        
-        set_processing_state(video_id, grid_position, "download", False)
+@st.fragment(run_every=2)
+def _poll_job(job_id: int):
+    """Poll an active job; rerun the page once it has finished."""
+    job = get_runner().store.get_job(job_id)
+    if not is_job_active(job):
+        refresh_artifacts(job['video_id'])
         st.rerun()
-    except Exception as e:
-        handle_process_error(e, video_id, grid_position, "download")
+    label = STAGE_LABELS[job['stage']]
+    if job['status'] == 'queued':
+        st.info(f"⏳ {label}: waiting for a worker...")
+    else:
+        st.progress(min(job['progress'], 1.0), text=f"{label}... {job['progress']:.0%}")
@@ -1,7 +1,7 @@
 import streamlit as st
 import math
 from domain.youtube_service import YouTubeService
-from ui.video_card import display_video_card
+from ui.video_card import display_video_card, get_card_statuses
 
 def display_search_results(youtube_service: YouTubeService):
     """Display search results with pagination"""
@@ -108,13 +108,15 @@ def display_search_results(youtube_service: YouTubeService):
         with grid:
             cols = st.columns(3)
             current_page = st.session_state.current_page
-            for i, video in enumerate(st.session_state.all_videos[start_idx:end_idx]):
-                print(f"[DEBUG] Rendering video {i+1} of page (ID: {video['id']})")
+            page_videos = st.session_state.all_videos[start_idx:end_idx]
+            # Look up every card's status at once instead of per card
+            statuses = get_card_statuses([video['id'] for video in page_videos])
+            for i, video in enumerate(page_videos):
                 with cols[i % 3]:
                     with st.container():
                         # Add grid position to context
                         grid_position = f"p{current_page}_r{i//3}_c{i%3}"
-                        display_video_card(video, youtube_service, grid_position)
+                        display_video_card(video, youtube_service, grid_position, statuses[video['id']])
         
         # Pagination controls
         if total_pages > 1:
@@ -1,16 +1,12 @@
 import streamlit as st
 from domain.youtube_service import YouTubeService
-from domain.audio_service import AudioService
-from domain.transcription_service import TranscriptionService
-from domain.audio_splitter import AudioSplitter
+from domain.artifact_index import get_artifact_index
 from utils.date_formatter import format_published_date
 from ui.process_handlers import (
-    get_processing_state,
-    set_processing_state,
-    handle_split_audio,
-    handle_transcription,
-    handle_conversion,
-    handle_download
+    submit_job,
+    get_video_jobs,
+    is_job_active,
+    show_job_status
 )
 
 def display_video_info(video: dict, video_id: str):
@@ -26,41 +22,47 @@ def display_video_info(video: dict, video_id: str):
     st.markdown(f"**Video ID:** {video_id}")
     st.markdown(f"**Published:** {format_published_date(video['published_at'])}")
 
-def display_video_card(video: dict, youtube_service: YouTubeService, grid_position: str):
-    """Display a single video card with download functionality."""
-    audio_service = AudioService()
-    transcription_service = TranscriptionService(api_key=st.session_state.openai_api_key)
-    audio_splitter = AudioSplitter()
+def get_card_statuses(video_ids):
+    """Get the processing status and latest job of every card on a page in one pass."""
+    statuses = get_artifact_index().get_statuses(video_ids)
+    jobs = get_video_jobs(video_ids)
+    for video_id, status in statuses.items():
+        status['job'] = jobs.get(video_id)
+    return statuses
+
+def display_video_card(video: dict, youtube_service: YouTubeService, grid_position: str, status: dict = None):
+    """Display a single video card with download functionality.
     
+    Args:
+        video: Video information
+        youtube_service: YouTube service of the page
+        grid_position: Position of the card, used to key its widgets
+        status: The card's entry from get_card_statuses (looked up if omitted)
+    """
     video_id = video['id']
-    file_path = youtube_service.get_source_path(video_id)
+    if status is None:
+        status = get_card_statuses([video_id])[video_id]
+    has_transcription = status['transcribed']
+    has_splits = status['wav_split']
+    has_converted = status['converted']
+    has_downloaded = status['downloaded']
+    job = status['job']
+    job_active = is_job_active(job)
     
     with st.container():
-        print(f"[DEBUG] Displaying video card for ID: {video_id} at position {grid_position}")
-        print(f"[DEBUG] Video title: {video.get('title', 'Unknown Title')}")
-        
         # Card container with fixed height and scrollable content
         with st.container():
             # Display video information
-            """Display video information."""
             st.image(
                 video['thumbnail'],
                 use_container_width=True
             )
             
-            # Process existing transcription
-            existing_transcription = transcription_service.get_transcription(video_id)
-            has_converted = audio_service.get_converted_file(video_id)
-            has_downloaded = youtube_service.is_audio_downloaded(video_id)
-
-            if transcription_service.has_transcription(video_id):
-                has_splits = audio_splitter.has_wav_splits(video_id)
+            if has_transcription:
                 if has_splits:
                     st.success("✅ Transcription and audio segments are available")
                 else:
                     st.success("✅ Transcription available")
-            elif existing_transcription:
-                st.success("✅ Transcription available")
             elif has_converted:
                 st.success("✅ Converted to OGG")
             elif has_downloaded:
@@ -72,53 +74,37 @@ def display_video_card(video: dict, youtube_service: YouTubeService, grid_positi
             st.markdown(f"**Video ID:** {video_id}")
             st.markdown(f"**Published:** {format_published_date(video['published_at'])}")
             
-            if transcription_service.has_transcription(video_id):
-                # Handle split audio button and processing
-                has_splits = audio_splitter.has_wav_splits(video_id)
-                if not has_splits:
-                    # Handle split audio button and processing
-                    if not get_processing_state(video_id, grid_position, "split"):
-                        if st.button("✂️ Split Audio", key=f"split_{video_id}_{grid_position}"):
-                            set_processing_state(video_id, grid_position, "split", True)
-                            st.rerun()
-                    
-                    if get_processing_state(video_id, grid_position, "split"):
-                        handle_split_audio(video_id, file_path, grid_position, audio_splitter, transcription_service)
+            # Progress of queued or running work, or the last failure
+            show_job_status(job)
+            
+            if has_transcription:
+                # Handle split audio button
+                if not has_splits and not job_active:
+                    if st.button("✂️ Split Audio", key=f"split_{video_id}_{grid_position}"):
+                        submit_job(video_id, 'split')
+                        st.rerun()
             
                 if st.button("📝 View Transcription", key=f"view_transcription_{video_id}_{grid_position}"):
                     st.session_state['selected_video_id'] = video_id
                     st.switch_page("pages/3_📝_Transcriptions.py")
                     
-            elif has_converted:
-                # Handle transcribe button and processing
-                if not get_processing_state(video_id, grid_position, "transcribe"):
+            elif not job_active:
+                if has_converted:
+                    # Handle transcribe button
                     if st.button("🎯 Transcribe", key=f"transcribe_{video_id}_{grid_position}"):
-                        set_processing_state(video_id, grid_position, "transcribe", True)
+                        submit_job(video_id, 'transcribe')
                         st.rerun()
-            
-                if get_processing_state(video_id, grid_position, "transcribe"):
-                    handle_transcription(video_id, file_path, grid_position, transcription_service, audio_splitter)
-                    
-            elif youtube_service.is_audio_downloaded(video_id):
-                # Handle convert button and processing
-                if not get_processing_state(video_id, grid_position, "convert"):
+                        
+                elif has_downloaded:
+                    # Handle convert button
                     if st.button("🔄 Convert to OGG", key=f"convert_{video_id}_{grid_position}"):
-                        set_processing_state(video_id, grid_position, "convert", True)
+                        submit_job(video_id, 'convert')
                         st.rerun()
-            
-                if get_processing_state(video_id, grid_position, "convert"):
-                    handle_conversion(video_id, file_path, grid_position, audio_service, 
-                                   transcription_service, audio_splitter)
-                    
-            else:
-                # Handle download button and processing
-                if not get_processing_state(video_id, grid_position, "download"):
+                        
+                else:
+                    # Handle download button
                     if st.button("🎵 Download", key=f"download_{video_id}_{grid_position}"):
-                        set_processing_state(video_id, grid_position, "download", True)
+                        submit_job(video_id, 'download', chain=False)
                         st.rerun()
-                
-                if get_processing_state(video_id, grid_position, "download"):
-                    handle_download(video_id, grid_position, youtube_service, audio_service,
-                                 transcription_service, audio_splitter)
     
     st.divider()
@@ -0,0 +1,107 @@
+"""Crash-safe file writes and cross-process advisory locks.
+
+Writers go to a temporary file in the target's directory, fsync it and
+rename it over the target, so readers only ever see the old or the new
+complete file. Read-modify-write sequences take an exclusive lock on a
+`<name>.lock` file next to the target, which also serialises writers in
+other processes (Streamlit sessions, batch workers) sharing the data dir.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks degrade to in-process only
+    fcntl = None
+
+# flock is per open file, so threads of one process also need a real lock
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+
+def _temp_path(path):
+    """Get a unique temp path next to path, keeping its extension for format detection."""
+    return path.with_name(f".{path.stem}.{os.getpid()}-{threading.get_ident()}.tmp{path.suffix}")
+
+
+def _fsync_file(path):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory):
+    """Persist a rename by syncing its directory (a no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_path(path):
+    """Yield a temp path to write to by name; it replaces path on success.
+
+    For writers that take a filename, e.g. DataFrame.to_excel or
+    pyarrow.parquet.write_table.
+    """
+    path = Path(path)
+    tmp_path = _temp_path(path)
+    try:
+        yield tmp_path
+        _fsync_file(tmp_path)
+        os.replace(tmp_path, path)
+        _fsync_dir(path.parent)
+    finally:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding=None):
+    """Open a temp file for writing; it replaces path when the block succeeds."""
+    if encoding is None and 'b' not in mode:
+        encoding = 'utf-8'
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def write_json(path, data, **kwargs):
+    """Atomically write data as JSON."""
+    kwargs.setdefault('indent', 2)
+    with atomic_write(path) as f:
+        json.dump(data, f, **kwargs)
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock for path across threads and processes.
+
+    Not reentrant: don't take the lock for a path that is already held.
+    """
+    lock_path = Path(path).with_name(Path(path).name + '.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    key = str(lock_path.resolve())
+    with _thread_locks_lock:
+        thread_lock = _thread_locks.setdefault(key, threading.Lock())
+
+    with thread_lock:
+        with open(lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
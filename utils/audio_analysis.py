@@ -0,0 +1,31 @@
+import numpy as np
+from utils.ffmpeg import read_pcm
+
+
+def find_quietest_point(source_path, around_ms, search_ms, sample_rate=16000, frame_ms=20, smoothing_frames=10):
+    """Find the quietest moment within search_ms of around_ms.
+
+    Decodes only the search window and scans short-frame energy, smoothed
+    over a few frames so a sustained pause wins over a single quiet frame.
+    Returns the position in milliseconds.
+    """
+    window_start_ms = max(0, around_ms - search_ms)
+    samples = read_pcm(
+        source_path,
+        window_start_ms / 1000,
+        (around_ms + search_ms - window_start_ms) / 1000,
+        sample_rate
+    ).astype(np.float32)
+
+    frame_length = int(sample_rate * frame_ms / 1000)
+    num_frames = len(samples) // frame_length
+    if num_frames == 0:
+        return around_ms
+
+    frames = samples[:num_frames * frame_length].reshape(num_frames, frame_length)
+    energy = np.mean(frames ** 2, axis=1)
+    if num_frames >= smoothing_frames:
+        energy = np.convolve(energy, np.ones(smoothing_frames) / smoothing_frames, mode='same')
+
+    quietest_frame = int(np.argmin(energy))
+    return int(window_start_ms + quietest_frame * frame_ms + frame_ms / 2)
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import threading
+
+# Probe results keyed by (path, mtime, size) so a changed file is re-probed
+_probe_cache = {}
+_probe_lock = threading.Lock()
+
+# Deterministic output: without these the Ogg muxer picks a random stream
+# serial and tags the encoder version, so re-encoding the same slice would
+# produce different bytes and defeat content-addressed caching
+BITEXACT_PARAMETERS = ['-fflags', '+bitexact', '-flags:a', '+bitexact']
+
+
+def probe_audio(source_path):
+    """Read duration, bitrate and size of an audio file without decoding it."""
+    stat = os.stat(source_path)
+    key = (os.path.abspath(source_path), stat.st_mtime, stat.st_size)
+    with _probe_lock:
+        if key in _probe_cache:
+            return _probe_cache[key]
+
+    command = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration,bit_rate',
+        '-of', 'json',
+        str(source_path),
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise Exception(f"ffprobe failed: {result.stderr.decode(errors='ignore').strip()}")
+
+    fmt = json.loads(result.stdout).get('format', {})
+    duration = float(fmt.get('duration') or 0)
+    bit_rate = int(fmt.get('bit_rate') or 0)
+    if not bit_rate and duration:
+        bit_rate = int(stat.st_size * 8 / duration)
+
+    info = {
+        'duration': duration,
+        'bit_rate': bit_rate,
+        'size': stat.st_size,
+    }
+    with _probe_lock:
+        _probe_cache[key] = info
+    return info
+
+
+def render_segment(source_path, start_seconds, duration_seconds, output_format='wav', parameters=None):
+    """Render a slice of an audio file to bytes using an ffmpeg pipe.
+
+    The seek is placed before the input so ffmpeg jumps straight to the
+    requested position instead of decoding the file from the beginning.
+    """
+    command = [
+        'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error',
+        '-ss', f"{max(start_seconds, 0):.3f}",
+        '-t', f"{max(duration_seconds, 0):.3f}",
+        '-i', str(source_path),
+        '-vn',
+    ]
+    command += BITEXACT_PARAMETERS
+    command += list(parameters or [])
+    command += ['-f', output_format, 'pipe:1']
+
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    return result.stdout
+
+
+def read_pcm(source_path, start_seconds, duration_seconds, sample_rate=16000):
+    """Decode a slice of an audio file to mono 16-bit PCM as a numpy array."""
+    import numpy as np
+
+    data = render_segment(
+        source_path,
+        start_seconds,
+        duration_seconds,
+        output_format='s16le',
+        parameters=['-ac', '1', '-ar', str(sample_rate), '-acodec', 'pcm_s16le']
+    )
+    return np.frombuffer(data, dtype=np.int16)
+
+
+def transcode(source_path, output_path, parameters=None):
+    """Transcode an audio file with ffmpeg, replacing output_path atomically."""
+    output_path = str(output_path)
+    tmp_path = f"{output_path}.tmp"
+    output_format = os.path.splitext(output_path)[1].lstrip('.')
+    command = [
+        'ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error', '-y',
+        '-i', str(source_path),
+        '-vn',
+    ]
+    command += BITEXACT_PARAMETERS
+    command += list(parameters or [])
+    command += ['-f', output_format, tmp_path]
+
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise Exception(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    os.replace(tmp_path, output_path)
+    return output_path
@@ -0,0 +1,139 @@
+"""OpenAI-compatible stand-in for the Whisper transcription endpoint.
+
+Serves POST /v1/audio/transcriptions with fake verbose JSON so the pipeline
+can be load-tested and benchmarked offline. Point the app at it with:
+
+    TRANSCRIPTION_BASE_URL=http://127.0.0.1:8001/v1
+
+Run with:
+
+    python -m utils.whisper_stub_server --port 8001 --latency 2.0 --error-rate 0.1
+"""
+import argparse
+import json
+import random
+import subprocess
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def estimate_duration(audio_bytes):
+    """Estimate audio duration in seconds, via ffprobe when available."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'json', 'pipe:0'],
+            input=audio_bytes, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        return float(json.loads(result.stdout)['format']['duration'])
+    except Exception:
+        # Assume roughly 128 kbps when the duration can't be read
+        return len(audio_bytes) * 8 / 128000
+
+
+def parse_multipart(content_type, body):
+    """Parse a multipart/form-data body into a dict of field name to bytes."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        fields[name] = part.get_payload(decode=True)
+    return fields
+
+
+class StubState:
+    def __init__(self, latency, error_rate, segment_seconds):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.segment_seconds = segment_seconds
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+
+class WhisperStubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            with self.state.lock:
+                self._send_json(200, {'requests': self.state.requests, 'errors': self.state.errors})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/audio/transcriptions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        fields = parse_multipart(self.headers.get('Content-Type', ''), body)
+
+        with self.state.lock:
+            self.state.requests += 1
+            throttled = random.random() < self.state.error_rate
+            if throttled:
+                self.state.errors += 1
+
+        time.sleep(self.state.latency)
+        if throttled:
+            self._send_json(429, {'error': {'message': 'Rate limit reached (stub)'}})
+            return
+
+        duration = estimate_duration(fields.get('file', b''))
+        language = (fields.get('language') or b'indonesian').decode()
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.state.segment_seconds, duration)
+            segments.append({
+                'id': len(segments),
+                'start': start,
+                'end': end,
+                'text': f" Segment {len(segments) + 1}."
+            })
+            start = end
+
+        self._send_json(200, {
+            'task': 'transcribe',
+            'language': language,
+            'duration': duration,
+            'text': ''.join(segment['text'] for segment in segments).strip(),
+            'segments': segments
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in Whisper transcription server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=1.0, help='Seconds to wait per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--segment-seconds', type=float, default=5.0, help='Length of fake segments')
+    args = parser.parse_args()
+
+    WhisperStubHandler.state = StubState(args.latency, args.error_rate, args.segment_seconds)
+    server = ThreadingHTTPServer((args.host, args.port), WhisperStubHandler)
+    print(f"Whisper stub listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()